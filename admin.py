@@ -1,10 +1,20 @@
 from django.contrib import admin
 
-from .models import Phase
+from .models import Dependency, Phase, SuiteTemplate
 
 
 @admin.register(Phase)
 class PhaseAdmin(admin.ModelAdmin):
     list_display = ("title", "parent", "position")
     list_filter = ("parent",)
-    list_editable = ("position",)
+
+
+@admin.register(SuiteTemplate)
+class SuiteTemplateAdmin(admin.ModelAdmin):
+    list_display = ("title",)
+
+
+@admin.register(Dependency)
+class DependencyAdmin(admin.ModelAdmin):
+    list_display = ("predecessor", "successor", "dependency_type", "lag")
+    list_filter = ("dependency_type",)
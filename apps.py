@@ -1,5 +1,5 @@
 from django.apps import AppConfig
-from django.db.models.signals import post_migrate
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_delete
 
 
 def create_timeline_group(sender, **kwargs):
@@ -20,4 +20,16 @@ class TimelineConfig(AppConfig):
     name = "timeline"
 
     def ready(self):
+        from .cache import (
+            dependency_changed,
+            phase_deleted,
+            phase_deleting,
+            phase_saved,
+        )
+
         post_migrate.connect(create_timeline_group, sender=self)
+        post_save.connect(phase_saved, sender="timeline.Phase")
+        pre_delete.connect(phase_deleting, sender="timeline.Phase")
+        post_delete.connect(phase_deleted, sender="timeline.Phase")
+        post_save.connect(dependency_changed, sender="timeline.Dependency")
+        post_delete.connect(dependency_changed, sender="timeline.Dependency")
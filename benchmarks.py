@@ -0,0 +1,177 @@
+import random
+from datetime import date, timedelta
+from time import perf_counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from .models import Phase, SuiteTemplate, create_phases, get_position_by_parent
+
+# Queries allowed for each case, whatever the size of the portfolio. Requests
+# include the session and user lookups of the test client.
+QUERY_BUDGETS = {
+    "project_list": 3,
+    "phase_list": 4,
+    "descendants_cte": 1,
+    "descendants_path": 1,
+    "ancestors_cte": 2,
+    "ancestors_path": 1,
+    "move_down": 15,
+    "delete": 18,
+    "create_suite": 15,
+}
+
+
+def make_nodes(rng, depth, fanout, fixed, anchor):
+    """Random tree of suite nodes, a fixed share of them with their own start"""
+    nodes = []
+    if depth < 1:
+        return nodes
+    for i in range(fanout):
+        node = {
+            "title": "Phase %(depth)s.%(i)s" % {"depth": depth, "i": i},
+            "phase_type": rng.choice(Phase.TYPES)[0],
+            "duration": rng.randint(1, 12),
+            "delay": rng.randint(-2, 4),
+            "children": make_nodes(rng, depth - 1, fanout, fixed, anchor),
+        }
+        if rng.random() < fixed:
+            node["start"] = anchor + timedelta(weeks=rng.randint(0, 52))
+        nodes.append(node)
+    return nodes
+
+
+def make_portfolio(projects=10, depth=3, fanout=3, fixed=0.2, seed=0):
+    """Creates projects, each with a tree of depth levels and fanout children
+    per phase, mixing fixed start and delay chained phases"""
+    rng = random.Random(seed)
+    anchor = date(date.today().year, 1, 1)
+    roots = [
+        Phase(
+            title="Project %(i)s" % {"i": i},
+            start=anchor + timedelta(weeks=rng.randint(0, 52)),
+            duration=rng.randint(1, 12),
+        )
+        for i in range(projects)
+    ]
+    SuiteTemplate(nodes=[]).create_projects(roots)
+    for root in roots:
+        create_phases([root], make_nodes(rng, depth, fanout, fixed, anchor))
+    return roots
+
+
+def tree_lookup(lookup, tree_index):
+    """Fetches lookup with the recursive CTE, or with stored paths"""
+
+    def func():
+        with override_settings(TIMELINE_TREE_INDEX=tree_index):
+            return list(lookup())
+
+    return func
+
+
+def measure(name, func, budget=None):
+    """Runs func, returning its wall time and query count against budget"""
+    with CaptureQueriesContext(connection) as context:
+        started = perf_counter()
+        response = func()
+        seconds = perf_counter() - started
+    queries = len(context.captured_queries)
+    if budget is None:
+        budget = QUERY_BUDGETS[name]
+    # operations other than requests return no status
+    status = getattr(response, "status_code", None)
+    return {
+        "name": name,
+        "seconds": round(seconds, 6),
+        "queries": queries,
+        "budget": budget,
+        "status": status,
+        "passed": queries <= budget and (status or 200) < 400,
+    }
+
+
+def run_benchmarks(projects=10, depth=3, fanout=3, fixed=0.2, seed=0):
+    """Times views and operations on a synthetic portfolio, returns a report.
+
+    Everything runs in a transaction that is rolled back, fragment caching is
+    disabled so that every request renders.
+    """
+    caches = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+    hosts = [*settings.ALLOWED_HOSTS, "testserver"]
+    with override_settings(CACHES=caches, ALLOWED_HOSTS=hosts):
+        with transaction.atomic():
+            report = _run_benchmarks(projects, depth, fanout, fixed, seed)
+            transaction.set_rollback(True)
+    return report
+
+
+def _run_benchmarks(projects, depth, fanout, fixed, seed):
+    roots = make_portfolio(projects, depth, fanout, fixed, seed)
+    user_model = get_user_model()
+    user = user_model(**{user_model.USERNAME_FIELD: "timeline_benchmark"})
+    user.is_active = user.is_superuser = True
+    user.save()
+    client = Client(HTTP_HX_REQUEST="true")
+    client.force_login(user)
+    today = date.today()
+    project = roots[len(roots) // 2]
+    # first child of the project's first child, it has siblings and children
+    phase = Phase.objects.filter(parent__parent=project).order_by(
+        "parent__position", "position"
+    )[0]
+    # roots need a free position
+    position = get_position_by_parent(None)
+    results = [
+        measure(
+            "project_list",
+            lambda: client.get(
+                reverse("timeline:project_list", args=[today.year, today.month])
+            ),
+        ),
+        measure(
+            "phase_list",
+            lambda: client.get(
+                reverse("timeline:list", args=[project.id, today.year, today.month])
+            ),
+        ),
+        measure(
+            "descendants_cte",
+            tree_lookup(lambda: project.descendants(include_self=True), False),
+        ),
+        measure(
+            "descendants_path",
+            tree_lookup(lambda: project.descendants(include_self=True), True),
+        ),
+        measure("ancestors_cte", tree_lookup(phase.ancestors, False)),
+        measure("ancestors_path", tree_lookup(phase.ancestors, True)),
+        measure(
+            "move_down",
+            lambda: client.post(reverse("timeline:move_down", args=[phase.id])),
+        ),
+        measure(
+            "delete",
+            lambda: client.post(reverse("timeline:delete", args=[phase.id])),
+        ),
+        measure(
+            "create_suite",
+            lambda: Phase.objects.create(
+                title="Suite", position=position
+            ).create_suite(),
+        ),
+    ]
+    return {
+        "vendor": connection.vendor,
+        "projects": projects,
+        "depth": depth,
+        "fanout": fanout,
+        "fixed": fixed,
+        "seed": seed,
+        "phases": Phase.objects.count(),
+        "results": results,
+        "passed": all(result["passed"] for result in results),
+    }
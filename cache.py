@@ -0,0 +1,126 @@
+from time import time_ns
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Phase, get_project_id, update_project_schedule, update_project_spans
+
+PROJECT_VERSION_KEY = "timeline.project.%(id)s.version"
+PORTFOLIO_VERSION_KEY = "timeline.portfolio.version"
+# bumped along with every project, validates lists of all projects
+PROJECTS_VERSION_KEY = "timeline.projects.version"
+
+
+def get_cache_timeout():
+    """Timeout of rendered fragments, versioned keys never go stale"""
+    return getattr(settings, "TIMELINE_CACHE_TIMEOUT", 86400)
+
+
+def get_versions(keys):
+    """Returns cached versions of keys, initializing missing ones.
+
+    Versions start from a timestamp, so that a version evicted from the
+    cache is never handed out again.
+    """
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time_ns(), None)
+            versions[key] = cache.get(key)
+    return versions
+
+
+def get_project_versions(project_ids):
+    keys = {pk: PROJECT_VERSION_KEY % {"id": pk} for pk in project_ids}
+    versions = get_versions(list(keys.values()))
+    return {pk: versions[key] for pk, key in keys.items()}
+
+
+def get_project_version(project_id):
+    return get_project_versions([project_id])[project_id]
+
+
+def get_portfolio_version():
+    return get_versions([PORTFOLIO_VERSION_KEY])[PORTFOLIO_VERSION_KEY]
+
+
+def get_projects_version():
+    return get_versions([PROJECTS_VERSION_KEY])[PROJECTS_VERSION_KEY]
+
+
+def bump_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time_ns(), None)
+
+
+def bump_project_version(project_id, portfolio=False):
+    """Invalidates fragments of project once the transaction commits"""
+
+    def bump():
+        bump_version(PROJECT_VERSION_KEY % {"id": project_id})
+        bump_version(PROJECTS_VERSION_KEY)
+        if portfolio:
+            bump_version(PORTFOLIO_VERSION_KEY)
+
+    transaction.on_commit(bump)
+
+
+def phase_saved(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    loaded = getattr(instance, "_loaded_schedule", {})
+    parent_id = loaded.get("parent_id", instance.parent_id)
+    root = not parent_id or not instance.parent_id
+    project_id = instance.get_project_id()
+    bump_project_version(project_id, portfolio=root)
+    project_ids = [project_id]
+    if parent_id != instance.parent_id:
+        # phase left another project
+        previous = get_project_id(parent_id) if parent_id else instance.id
+        bump_project_version(previous, portfolio=root)
+        if parent_id:
+            # dependencies left behind may free phases of previous project
+            update_project_schedule(previous)
+        else:
+            Phase.objects.filter(id=instance.id).update(span_end=None)
+            instance.span_end = None
+    if not created and instance.schedule_changed():
+        # spans follow the reschedule of the saved phase
+        return
+    if not created and getattr(instance, "_loaded_position", None) == (
+        instance.position
+    ):
+        return
+    ends = update_project_spans(project_ids)
+    if not instance.parent_id:
+        instance.span_end = ends.get(instance.id)
+
+
+def phase_deleting(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, sender) and origin.pk != instance.pk:
+        # cascading from an ancestor, which bumps the project
+        return
+    project_id = instance.get_project_id()
+    if project_id:
+        bump_project_version(project_id, portfolio=not instance.parent_id)
+    instance._deleted_project_id = project_id
+
+
+def phase_deleted(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, sender) and origin.pk != instance.pk:
+        return
+    project_id = getattr(instance, "_deleted_project_id", None)
+    if instance.parent_id and project_id:
+        update_project_schedule(project_id)
+
+
+def dependency_changed(sender, instance, raw=False, origin=None, **kwargs):
+    if raw or isinstance(origin, Phase):
+        # deleting phases bumps their project
+        return
+    project_id = get_project_id(instance.successor_id)
+    if project_id:
+        bump_project_version(project_id)
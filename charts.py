@@ -0,0 +1,75 @@
+from django.conf import settings
+
+from .models import ZOOMS, get_chart_columns
+
+CHART_MODES = ["table", "svg"]
+CHART_MODE_KEY = "timeline_chart_mode"
+CHART_ZOOM_KEY = "timeline_chart_zoom"
+# pixels, the header row holds column labels
+CHART_ROW_HEIGHT = 20
+# percent of the chart width taken by row labels
+CHART_LABEL_WIDTH = 25
+
+
+def get_chart_mode(request):
+    """Mode chosen with the mode parameter and kept in session, else the
+    default one"""
+    mode = request.GET.get("mode")
+    if mode in CHART_MODES:
+        request.session[CHART_MODE_KEY] = mode
+        return mode
+    default = getattr(settings, "TIMELINE_CHART_MODE", CHART_MODES[0])
+    return request.session.get(CHART_MODE_KEY, default)
+
+
+def get_chart_zoom(request):
+    """Zoom chosen with the zoom parameter and kept in session, else the
+    default one"""
+    zoom = request.GET.get("zoom")
+    if zoom in ZOOMS:
+        request.session[CHART_ZOOM_KEY] = zoom
+        return zoom
+    default = getattr(settings, "TIMELINE_CHART_ZOOM", "year")
+    return request.session.get(CHART_ZOOM_KEY, default)
+
+
+def get_svg_chart(phases, year, month, project=False, zoom="year"):
+    """Header columns and rows of an SVG Gantt of phases, project spans if
+    project is True. Bars are positioned in percent of the bar area, folded
+    phases are left out"""
+    phases = [phase for phase in phases if not getattr(phase, "folded", False)]
+    rows = []
+    for i, phase in enumerate(phases):
+        margin, width = phase.get_bar_geometry(year, month, project, zoom)
+        y = (i + 1) * CHART_ROW_HEIGHT
+        if project:
+            label = phase.title
+            popup = phase.get_project_popup()
+            color = "#cccccc"
+        else:
+            label = "%(index)s %(title)s" % {
+                "index": phase.get_punctuated_index(),
+                "title": phase.title,
+            }
+            popup = phase.get_popup()
+            color = phase.phase_type
+        rows.append(
+            {
+                "phase": phase,
+                "label": label,
+                "popup": popup,
+                "color": color,
+                "text_y": y + 14,
+                "bar_y": y + 4,
+                "x": "%g" % margin,
+                "width": "%g" % width,
+            }
+        )
+    return {
+        "columns": get_chart_columns(year, month, zoom),
+        "rows": rows,
+        "project": project,
+        "label_width": CHART_LABEL_WIDTH,
+        "bar_width": 100 - CHART_LABEL_WIDTH,
+        "height": (len(rows) + 1) * CHART_ROW_HEIGHT,
+    }
@@ -1,22 +1,138 @@
 from django import forms
 from django.forms import ModelForm
+from django.forms.models import ModelChoiceIterator
 from django.utils.translation import gettext_lazy as _
 from tree_queries.forms import TreeNodeChoiceField
 
-from .models import Phase
+from .imports import get_import_format, read_tree
+from .models import Phase, SuiteTemplate, get_project_phases
+
+
+class ParentChoiceIterator(ModelChoiceIterator):
+    """Choices of the queryset, followed by the selected phase if it is not
+    among them"""
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        values = set()
+        # fetched at once, resolvers may sort phases in tree order
+        for obj in self.queryset:
+            value, label = self.choice(obj)
+            values.add(str(value))
+            yield value, label
+        selected = self.field.selected
+        if selected in self.field.empty_values or str(selected) in values:
+            return
+        try:
+            yield self.choice(Phase.objects.get(pk=selected))
+        except (ValueError, TypeError, Phase.DoesNotExist):
+            return
+
+
+class ParentChoiceField(TreeNodeChoiceField):
+    """Offers the phases of the queryset, usually those of one project, but
+    accepts any phase, as found by the parent search"""
+
+    iterator = ParentChoiceIterator
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.selected = None
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            return Phase.objects.get(pk=value)
+        except (ValueError, TypeError, Phase.DoesNotExist):
+            raise forms.ValidationError(
+                self.error_messages["invalid_choice"],
+                code="invalid_choice",
+                params={"value": value},
+            )
+
+    def label_from_instance(self, obj):
+        label = super().label_from_instance(obj)
+        # resolved on search results
+        if getattr(obj, "project_title", None):
+            label += " (%(project)s)" % {"project": obj.project_title}
+        return label
 
 
 class PhaseCreateForm(ModelForm):
-    parent = TreeNodeChoiceField(queryset=Phase.objects.all(), required=False)
+    parent = ParentChoiceField(queryset=Phase.objects.all(), required=False)
 
     class Meta:
         model = Phase
         exclude = ("position",)
 
+    def __init__(self, *args, project=None, **kwargs):
+        """Parent choices are restricted to the phases of project"""
+        super().__init__(*args, **kwargs)
+        self.project = project
+        field = self.fields["parent"]
+        if project:
+            field.queryset = get_project_phases(project)
+        field.selected = self["parent"].value()
+
 
 class ProjectCreateForm(ModelForm):
-    suite = forms.BooleanField(initial=False, label=_("Create suite"), required=False)
+    suite = forms.ModelChoiceField(
+        queryset=SuiteTemplate.objects.all(), label=_("Create suite"), required=False
+    )
 
     class Meta:
         model = Phase
         fields = ("title", "start")
+
+
+class PhaseReorderForm(forms.Form):
+    index = forms.IntegerField(min_value=0)
+
+
+class PhaseParentSearchForm(forms.Form):
+    search = forms.CharField(required=False)
+    project = forms.IntegerField(required=False)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if not cleaned_data.get("search") and not cleaned_data.get("project"):
+            raise forms.ValidationError(_("Search or project required"))
+        return cleaned_data
+
+
+class PhaseExportForm(forms.Form):
+    format = forms.ChoiceField(
+        choices=[("csv", "CSV"), ("jsonl", "JSON Lines")], required=False
+    )
+    project = forms.ModelMultipleChoiceField(
+        queryset=Phase.objects.filter(parent_id=None), required=False
+    )
+    start = forms.DateField(required=False)
+    end = forms.DateField(required=False)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start, end = cleaned_data.get("start"), cleaned_data.get("end")
+        if start and end and start > end:
+            raise forms.ValidationError(_("Start must precede end"))
+        return cleaned_data
+
+
+class PhaseImportForm(forms.Form):
+    file = forms.FileField(
+        label=_("File"), help_text=_("CSV, JSON, JSON Lines or MS Project XML")
+    )
+
+    def clean_file(self):
+        upload = self.cleaned_data["file"]
+        import_format = get_import_format(upload.name)
+        if not import_format:
+            raise forms.ValidationError(_("Unsupported file type"))
+        try:
+            text = upload.read().decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise forms.ValidationError(_("File must be UTF-8 text"))
+        self.cleaned_data["nodes"] = read_tree(text, import_format)
+        return upload
@@ -0,0 +1,266 @@
+import csv
+import io
+import json
+import math
+import re
+from datetime import date
+from xml.etree import ElementTree
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+
+from .models import (
+    Phase,
+    bulk_save_phases,
+    create_trees,
+    get_position_by_parent,
+    get_position_gap,
+    lock_siblings,
+)
+
+IMPORT_FORMATS = ["csv", "json", "jsonl", "xml"]
+MSP_NAMESPACE = "{http://schemas.microsoft.com/project}"
+MSP_DURATION = re.compile(r"^PT(\d+)H(\d+)M(\d+)S$")
+# MS Project durations are worked hours
+MSP_HOURS_PER_WEEK = 40
+
+
+def get_import_format(name):
+    """Guesses the format from the extension of a file name"""
+    extension = name.rsplit(".", 1)[-1].lower()
+    return extension if extension in IMPORT_FORMATS else None
+
+
+def read_csv(text):
+    """Rows keyed by column, numbered by line, as exported as CSV"""
+    reader = csv.DictReader(io.StringIO(text))
+    return [(reader.line_num, row) for row in reader]
+
+
+def read_jsonl(text):
+    """Rows numbered by line, as exported as JSON Lines"""
+    rows = []
+    for number, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            rows.append((number, json.loads(line)))
+        except ValueError:
+            raise ValidationError(
+                _("Row %(row)s: invalid JSON") % {"row": number}
+            ) from None
+    return rows
+
+
+def read_json(text):
+    """Rows of a tree of nodes like suite templates, numbered in tree order"""
+    try:
+        nodes = json.loads(text)
+    except ValueError:
+        raise ValidationError(_("Invalid JSON")) from None
+    rows = []
+
+    def flatten(nodes, prefix):
+        if not isinstance(nodes, list):
+            raise ValidationError(_("Phases must be a list"))
+        for i, node in enumerate(nodes):
+            if not isinstance(node, dict):
+                raise ValidationError(_("Phases must be objects"))
+            index = prefix + [str(i)]
+            row = {key: value for key, value in node.items() if key != "children"}
+            row["index"] = ".".join(index)
+            rows.append((len(rows) + 1, row))
+            flatten(node.get("children", []), index)
+
+    flatten(nodes, [])
+    return rows
+
+
+def read_xml(text):
+    """Rows of the tasks of an MS Project XML file, numbered as tasks.
+
+    Outline numbers give the tree, below the project summary task if any.
+    Every task keeps its start date, since summary tasks run alongside their
+    subtasks.
+    """
+    try:
+        root = ElementTree.fromstring(text)
+    except ElementTree.ParseError:
+        raise ValidationError(_("Invalid XML")) from None
+    tasks = list(root.iter(MSP_NAMESPACE + "Task"))
+    summary = any(get_msp_value(task, "OutlineLevel") == "0" for task in tasks)
+    rows = []
+    for number, task in enumerate(tasks, start=1):
+        if get_msp_value(task, "IsNull") == "1":
+            # blank line
+            continue
+        index = get_msp_value(task, "OutlineNumber")
+        if get_msp_value(task, "OutlineLevel") == "0":
+            index = "0"
+        elif summary:
+            index = "0." + index
+        row = {
+            "index": index,
+            "title": get_msp_value(task, "Name"),
+            "start": get_msp_value(task, "Start")[:10],
+            "duration": get_msp_value(task, "Duration"),
+        }
+        match = MSP_DURATION.match(row["duration"])
+        if match:
+            hours, minutes, seconds = map(int, match.groups())
+            hours += minutes / 60 + seconds / 3600
+            row["duration"] = math.ceil(hours / MSP_HOURS_PER_WEEK)
+        rows.append((number, row))
+    return rows
+
+
+def get_msp_value(task, tag):
+    return task.findtext(MSP_NAMESPACE + tag, "").strip()
+
+
+READERS = {
+    "csv": read_csv,
+    "json": read_json,
+    "jsonl": read_jsonl,
+    "xml": read_xml,
+}
+
+
+def get_phase_type(value):
+    """Type from its value or its label, the default one if blank"""
+    if not value:
+        return Phase.TYPES[0][0]
+    for phase_type, label in Phase.TYPES:
+        if value in (phase_type, str(label)):
+            return phase_type
+    raise ValidationError(_("Unknown type %(type)s") % {"type": value})
+
+
+def get_integer(value, default):
+    if value in (None, ""):
+        return default
+    if isinstance(value, bool) or isinstance(value, float) and not value.is_integer():
+        raise ValueError
+    return int(value)
+
+
+def clean_row(row):
+    """Returns the index and the node of a row, raises ValidationError"""
+    if not isinstance(row, dict):
+        raise ValidationError(_("Rows must be objects"))
+    try:
+        index = tuple(int(i) for i in str(row.get("index", "")).split("."))
+    except ValueError:
+        raise ValidationError(
+            _("Invalid index %(index)s") % {"index": row.get("index")}
+        ) from None
+    title = str(row.get("title") or "").strip()
+    if not title:
+        raise ValidationError(_("Every phase needs a title"))
+    max_length = Phase._meta.get_field("title").max_length
+    if len(title) > max_length:
+        raise ValidationError(
+            _("Title is longer than %(max)s characters") % {"max": max_length}
+        )
+    node = {
+        "title": title,
+        "phase_type": get_phase_type(row.get("type", row.get("phase_type"))),
+        "children": [],
+    }
+    try:
+        node["duration"] = get_integer(row.get("duration"), 1)
+    except (TypeError, ValueError):
+        node["duration"] = -1
+    if node["duration"] < 0:
+        raise ValidationError(_("Duration must be a positive integer"))
+    try:
+        node["delay"] = get_integer(row.get("delay"), 0)
+    except (TypeError, ValueError):
+        raise ValidationError(_("Delay must be an integer")) from None
+    if row.get("start"):
+        try:
+            node["start"] = date.fromisoformat(str(row["start"]))
+        except ValueError:
+            raise ValidationError(
+                _("Invalid start %(start)s") % {"start": row["start"]}
+            ) from None
+    return index, node
+
+
+def build_tree(rows):
+    """Validates all rows at once, and nests their nodes by punctuated index.
+
+    Returns the list of top level nodes, ValidationError lists the errors
+    of every row.
+    """
+    errors = []
+    nodes = {}
+    for number, row in rows:
+        try:
+            index, node = clean_row(row)
+        except ValidationError as error:
+            errors += [
+                _("Row %(row)s: %(error)s") % {"row": number, "error": message}
+                for message in error.messages
+            ]
+            continue
+        if index in nodes:
+            errors.append(
+                _("Row %(row)s: duplicate index %(index)s")
+                % {"row": number, "index": ".".join(map(str, index))}
+            )
+            continue
+        nodes[index] = (number, node)
+    top = []
+    for index in sorted(nodes):
+        number, node = nodes[index]
+        if len(index) == 1:
+            top.append(node)
+        elif index[:-1] in nodes:
+            nodes[index[:-1]][1]["children"].append(node)
+        else:
+            errors.append(
+                _("Row %(row)s: no parent with index %(index)s")
+                % {"row": number, "index": ".".join(map(str, index[:-1]))}
+            )
+    if not rows:
+        errors.append(_("No phases to import"))
+    if errors:
+        raise ValidationError(errors)
+    return top
+
+
+def read_tree(text, import_format):
+    """Parses text in import_format, returns the validated tree of nodes"""
+    return build_tree(READERS[import_format](text))
+
+
+def import_tree(nodes, project=None):
+    """Creates top level nodes as new projects, or appends them to project.
+
+    Everything is inserted in one transaction, one level at a time. Returns
+    the created phases.
+    """
+    with transaction.atomic():
+        if project:
+            lock_siblings(project)
+            return create_trees([(project, nodes)], append=True)
+        roots = [
+            Phase(
+                title=node["title"],
+                phase_type=node["phase_type"],
+                duration=node["duration"],
+                start=node.get("start"),
+            )
+            for node in nodes
+        ]
+        lock_siblings(None)
+        position = get_position_by_parent(None)
+        for i, root in enumerate(roots):
+            root.position = position + i * get_position_gap()
+            root.prepare_dates()
+            root.set_computed_schedule()
+        bulk_save_phases(roots)
+        trees = [(root, node["children"]) for root, node in zip(roots, nodes)]
+        return roots + create_trees(trees)
@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils.timezone import now
+from timeline.models import purge_phases
+
+
+class Command(BaseCommand):
+    help = "Removes phases soft deleted more than some days ago"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=getattr(settings, "TIMELINE_PURGE_DAYS", 30),
+            help="Age of the deleted phases to remove",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        before = now() - timedelta(days=options["days"])
+        count = purge_phases(before, options["batch_size"])
+        self.stdout.write("Purged %(count)s phases" % {"count": count})
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from timeline.models import Phase, lock_siblings, rebalance_siblings
+
+
+class Command(BaseCommand):
+    help = "Spreads sibling positions of all phases a gap apart"
+
+    def handle(self, *args, **options):
+        parents = Phase.objects.filter(children__isnull=False).distinct()
+        parents = [None, *parents.order_by()]
+        for parent in parents:
+            with transaction.atomic():
+                lock_siblings(parent)
+                rebalance_siblings(parent)
+        self.stdout.write("Rebalanced %(count)s sibling sets" % {"count": len(parents)})
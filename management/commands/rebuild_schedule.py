@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from timeline.models import rebuild_computed_schedule
+
+
+class Command(BaseCommand):
+    help = "Recomputes computed start and end of all phases"
+
+    def handle(self, *args, **options):
+        count = rebuild_computed_schedule()
+        self.stdout.write("Updated %(count)s phases" % {"count": count})
@@ -0,0 +1,35 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from timeline.benchmarks import run_benchmarks
+
+
+class Command(BaseCommand):
+    help = "Times views on a synthetic portfolio and checks their query budgets"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--projects", type=int, default=10)
+        parser.add_argument("--depth", type=int, default=3)
+        parser.add_argument("--fanout", type=int, default=3)
+        parser.add_argument(
+            "--fixed", type=float, default=0.2, help="Share of fixed start phases"
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Writes the JSON report to this file")
+
+    def handle(self, *args, **options):
+        report = run_benchmarks(
+            projects=options["projects"],
+            depth=options["depth"],
+            fanout=options["fanout"],
+            fixed=options["fixed"],
+            seed=options["seed"],
+        )
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(report, f, indent=2)
+        else:
+            self.stdout.write(json.dumps(report, indent=2))
+        if not report["passed"]:
+            failed = [r["name"] for r in report["results"] if not r["passed"]]
+            raise CommandError("Over query budget: %s" % ", ".join(failed))
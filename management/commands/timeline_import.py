@@ -0,0 +1,35 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from timeline.imports import IMPORT_FORMATS, get_import_format, import_tree, read_tree
+from timeline.models import Phase
+
+
+class Command(BaseCommand):
+    help = "Imports projects from CSV, JSON, JSON Lines or MS Project XML"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument(
+            "--format", choices=IMPORT_FORMATS, help="Guessed from the extension"
+        )
+        parser.add_argument(
+            "--project", type=int, help="Appends phases to this project"
+        )
+
+    def handle(self, *args, **options):
+        import_format = options["format"] or get_import_format(options["path"])
+        if not import_format:
+            raise CommandError("Unknown format, use --format")
+        project = None
+        if options["project"]:
+            try:
+                project = Phase.objects.get(id=options["project"], parent_id=None)
+            except Phase.DoesNotExist:
+                raise CommandError("Project %s not found" % options["project"])
+        with open(options["path"], encoding="utf-8-sig") as f:
+            text = f.read()
+        try:
+            created = import_tree(read_tree(text, import_format), project)
+        except ValidationError as error:
+            raise CommandError("\n".join(error.messages))
+        self.stdout.write("Imported %(count)s phases" % {"count": len(created)})
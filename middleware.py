@@ -0,0 +1,93 @@
+import logging
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+logger = logging.getLogger("timeline")
+
+
+class QueryTimer:
+    """Database execute wrapper counting queries and their time"""
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.seconds += perf_counter() - started
+
+
+class ServerTimingMiddleware:
+    """Adds a Server-Timing header to responses of timeline views, with
+    queries, SQL time and render time, and logs slow requests.
+
+    Enabled by TIMELINE_SERVER_TIMING, removed from the chain otherwise.
+    Render time leaves out queries made while rendering, which are counted
+    in SQL time.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "TIMELINE_SERVER_TIMING", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow = getattr(settings, "TIMELINE_SLOW_REQUEST_MS", None)
+
+    def __call__(self, request):
+        started = perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            timer = getattr(request, "_timeline_timer", None)
+            if timer:
+                connection.execute_wrappers.remove(timer)
+        if not timer:
+            return response
+        total = (perf_counter() - started) * 1000
+        sql = timer.seconds * 1000
+        render = 0.0
+        if hasattr(request, "_timeline_render"):
+            render_started, sql_before = request._timeline_render
+            render = (perf_counter() - render_started) * 1000
+            render -= sql - sql_before
+        response["Server-Timing"] = (
+            'db;dur=%(sql).1f;desc="%(queries)s queries", '
+            "render;dur=%(render).1f, total;dur=%(total).1f"
+        ) % {
+            "sql": sql,
+            "queries": timer.queries,
+            "render": render,
+            "total": total,
+        }
+        if self.slow is not None and total >= self.slow:
+            logger.warning(
+                "Slow request %(path)s: %(total).1f ms, %(queries)s queries "
+                "in %(sql).1f ms, render %(render).1f ms",
+                {
+                    "path": request.get_full_path(),
+                    "total": total,
+                    "queries": timer.queries,
+                    "sql": sql,
+                    "render": render,
+                },
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.resolver_match.app_name != "timeline":
+            return None
+        request._timeline_timer = QueryTimer()
+        connection.execute_wrappers.append(request._timeline_timer)
+        return None
+
+    def process_template_response(self, request, response):
+        timer = getattr(request, "_timeline_timer", None)
+        if timer:
+            request._timeline_render = (perf_counter(), timer.seconds * 1000)
+        return response
@@ -0,0 +1,66 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:43
+
+import timeline.models
+from django.db import migrations, models
+
+STANDARD_SUITE = [
+    ("#e3342f", "Feasibility study"),
+    ("#f6993f", "Preliminary design"),
+    ("#ffed4a", "Definitive design"),
+    ("#38c172", "Authoring"),
+    ("#4dc0b5", "Construction design"),
+    ("#3490dc", "Tender design"),
+    ("#6574cd", "Project management"),
+    ("#9561e2", "Construction supervision"),
+    ("#f66d9b", "Maintenance design"),
+]
+
+
+def create_standard_suite(apps, schema_editor):
+    SuiteTemplate = apps.get_model("timeline", "SuiteTemplate")
+    nodes = []
+    for phase_type, title in reversed(STANDARD_SUITE):
+        nodes = [{"title": title, "phase_type": phase_type, "children": nodes}]
+    SuiteTemplate.objects.create(title="Standard suite", nodes=nodes)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("timeline", "0003_alter_phase_delay_alter_phase_duration_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SuiteTemplate",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("title", models.CharField(max_length=50, verbose_name="Name")),
+                (
+                    "nodes",
+                    models.JSONField(
+                        default=list,
+                        help_text=(
+                            "List of phases with title, type, duration, delay "
+                            "and children"
+                        ),
+                        validators=[timeline.models.validate_suite_nodes],
+                        verbose_name="Phases",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Suite template",
+                "verbose_name_plural": "Suite templates",
+                "ordering": ["title"],
+            },
+        ),
+        migrations.RunPython(create_standard_suite, migrations.RunPython.noop),
+    ]
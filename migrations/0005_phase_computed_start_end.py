@@ -0,0 +1,52 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:44
+
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+def compute_schedule(apps, schema_editor):
+    Phase = apps.get_model("timeline", "Phase")
+    phases = list(Phase.objects.all())
+    children = {}
+    for phase in phases:
+        children.setdefault(phase.parent_id, []).append(phase)
+    # walk down from roots, parents first
+    stack = [(phase, None) for phase in children.get(None, [])]
+    while stack:
+        phase, parent_end = stack.pop()
+        start = phase.start
+        if not start and parent_end:
+            start = parent_end + timedelta(days=phase.delay * 7)
+        phase.computed_start = start
+        phase.computed_end = None
+        if start:
+            phase.computed_end = start + timedelta(days=phase.duration * 7)
+        stack += [(child, phase.computed_end) for child in children.get(phase.id, [])]
+    Phase.objects.bulk_update(
+        phases, ["computed_start", "computed_end"], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("timeline", "0004_suitetemplate"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="phase",
+            name="computed_end",
+            field=models.DateField(
+                db_index=True, editable=False, null=True, verbose_name="Computed end"
+            ),
+        ),
+        migrations.AddField(
+            model_name="phase",
+            name="computed_start",
+            field=models.DateField(
+                db_index=True, editable=False, null=True, verbose_name="Computed start"
+            ),
+        ),
+        migrations.RunPython(compute_schedule, migrations.RunPython.noop),
+    ]
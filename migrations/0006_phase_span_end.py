@@ -0,0 +1,45 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:53
+
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+def compute_spans(apps, schema_editor):
+    Phase = apps.get_model("timeline", "Phase")
+    youngest = {}
+    # the last child in order overwrites its older siblings
+    for phase in Phase.objects.exclude(parent_id=None).order_by("position", "id"):
+        youngest[phase.parent_id] = phase
+    roots = list(Phase.objects.filter(parent_id=None))
+    for root in roots:
+        # follow the youngest child down, as the project span query does
+        phase, anchor, weeks = root, root.start, 0
+        while phase.id in youngest:
+            child = youngest[phase.id]
+            if child.start:
+                anchor, weeks = child.start, 0
+            else:
+                weeks += phase.duration + child.delay
+            phase = child
+        root.span_end = None
+        if anchor:
+            root.span_end = anchor + timedelta(days=(weeks + phase.duration) * 7)
+    Phase.objects.bulk_update(roots, ["span_end"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("timeline", "0005_phase_computed_start_end"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="phase",
+            name="span_end",
+            field=models.DateField(
+                db_index=True, editable=False, null=True, verbose_name="Project end"
+            ),
+        ),
+        migrations.RunPython(compute_spans, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("timeline", "0006_phase_span_end"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Dependency",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "dependency_type",
+                    models.CharField(
+                        choices=[("FS", "Finish to start"), ("SS", "Start to start")],
+                        default="FS",
+                        max_length=2,
+                        verbose_name="Type",
+                    ),
+                ),
+                (
+                    "lag",
+                    models.IntegerField(
+                        default=0, help_text="In weeks", verbose_name="Lag"
+                    ),
+                ),
+                (
+                    "predecessor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="successor_dependencies",
+                        to="timeline.phase",
+                        verbose_name="Predecessor",
+                    ),
+                ),
+                (
+                    "successor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="predecessor_dependencies",
+                        to="timeline.phase",
+                        verbose_name="Successor",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Dependency",
+                "verbose_name_plural": "Dependencies",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="dependency",
+            constraint=models.UniqueConstraint(
+                fields=("predecessor", "successor"), name="timeline_dependency_unique"
+            ),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:23
+
+from itertools import groupby
+from operator import itemgetter
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def repair_positions(apps, schema_editor):
+    Phase = apps.get_model("timeline", "Phase")
+    gap = getattr(settings, "TIMELINE_POSITION_GAP", 1)
+    rows = Phase.objects.order_by("parent_id", "position", "id")
+    rows = rows.values_list("id", "parent_id", "position")
+    changed = []
+    for parent_id, siblings in groupby(rows.iterator(), key=itemgetter(1)):
+        siblings = list(siblings)
+        positions = [position for id, parent_id, position in siblings]
+        if gap == 1:
+            # dense positions are the index itself, no gaps
+            targets = range(len(siblings))
+        elif len(set(positions)) < len(positions):
+            # sparse positions tolerate gaps, spread duplicates a gap apart
+            targets = [(i + 1) * gap for i in range(len(siblings))]
+        else:
+            continue
+        changed += [
+            Phase(id=id, position=target)
+            for (id, parent_id, position), target in zip(siblings, targets)
+            if position != target
+        ]
+    Phase.objects.bulk_update(changed, ["position"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("timeline", "0007_dependency"),
+    ]
+
+    operations = [
+        migrations.RunPython(repair_positions, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="phase",
+            constraint=models.UniqueConstraint(
+                fields=("parent", "position"), name="timeline_phase_unique_position"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="phase",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("parent", None)),
+                fields=("position",),
+                name="timeline_phase_unique_root_position",
+            ),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:28
+
+from django.db import migrations, models
+
+
+def store_paths(apps, schema_editor):
+    Phase = apps.get_model("timeline", "Phase")
+    children = {}
+    for id, parent_id in Phase.objects.values_list("id", "parent_id").iterator():
+        children.setdefault(parent_id, []).append(id)
+    changed = []
+    # one level of the tree at a time, from the roots down
+    level = [(id, "", 0) for id in children.get(None, [])]
+    while level:
+        next_level = []
+        for id, path, depth in level:
+            if depth:
+                changed.append(Phase(id=id, path=path, depth=depth))
+            # ids take ten digits in paths
+            prefix = path + "%010d" % id
+            next_level += [(child, prefix, depth + 1) for child in children.get(id, [])]
+        level = next_level
+    Phase.objects.bulk_update(changed, ["path", "depth"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("timeline", "0008_phase_unique_position"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="phase",
+            name="depth",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Tree depth"
+            ),
+        ),
+        migrations.AddField(
+            model_name="phase",
+            name="path",
+            field=models.CharField(
+                db_index=True,
+                default="",
+                editable=False,
+                max_length=500,
+                verbose_name="Tree path",
+            ),
+        ),
+        migrations.RunPython(store_paths, migrations.RunPython.noop),
+    ]
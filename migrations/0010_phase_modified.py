@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-18 22:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("timeline", "0009_phase_path_depth"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="phase",
+            name="modified",
+            field=models.DateTimeField(
+                auto_now=True,
+                default=django.utils.timezone.now,
+                verbose_name="Modified",
+            ),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.30 on 2026-10-18 22:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("timeline", "0010_phase_modified"),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="phase",
+            name="timeline_phase_unique_position",
+        ),
+        migrations.RemoveConstraint(
+            model_name="phase",
+            name="timeline_phase_unique_root_position",
+        ),
+        migrations.AddField(
+            model_name="phase",
+            name="deleted_at",
+            field=models.DateTimeField(
+                db_index=True, editable=False, null=True, verbose_name="Deleted at"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="phase",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("deleted_at", None)),
+                fields=("parent", "position"),
+                name="timeline_phase_unique_position",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="phase",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("deleted_at", None), ("parent", None)),
+                fields=("position",),
+                name="timeline_phase_unique_root_position",
+            ),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.30 on 2026-10-18 21:01
+
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+def fill_spans(apps, schema_editor):
+    Phase = apps.get_model("timeline", "Phase")
+    roots = list(Phase.objects.filter(parent_id=None, span_end=None, deleted_at=None))
+    if not roots:
+        return
+    youngest = {}
+    # the last child in order overwrites its older siblings
+    phases = Phase.objects.exclude(parent_id=None).filter(deleted_at=None)
+    for phase in phases.order_by("position", "id"):
+        youngest[phase.parent_id] = phase
+    for root in roots:
+        # follow the youngest child down, as the project span query does
+        phase, anchor, weeks = root, root.start, 0
+        while phase.id in youngest:
+            child = youngest[phase.id]
+            if child.start:
+                anchor, weeks = child.start, 0
+            else:
+                weeks += phase.duration + child.delay
+            phase = child
+        root.span_end = phase.computed_end
+        if not root.span_end and anchor:
+            root.span_end = anchor + timedelta(days=(weeks + phase.duration) * 7)
+    Phase.objects.bulk_update(roots, ["span_end"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("timeline", "0011_phase_deleted_at"),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_spans, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="phase",
+            index=models.Index(
+                fields=["parent", "span_end", "computed_start"],
+                name="timeline_phase_window",
+            ),
+        ),
+    ]
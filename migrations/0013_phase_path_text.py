@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-18 21:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("timeline", "0012_phase_window"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="phase",
+            name="path",
+            field=models.TextField(
+                db_index=True, default="", editable=False, verbose_name="Tree path"
+            ),
+        ),
+    ]
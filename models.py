@@ -1,10 +1,165 @@
 import calendar
+from collections import deque
 from datetime import date, timedelta
+from functools import partial
 
-from django.db import models
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connection, models, transaction
+from django.db.models import (
+    Case,
+    Count,
+    Exists,
+    F,
+    Max,
+    OuterRef,
+    Q,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, Concat, Substr
+from django.db.models.query import ModelIterable
 from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _
 from tree_queries.models import TreeNode
+from tree_queries.query import TreeManager, TreeQuerySet, pk
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# digits of every id in stored tree paths, zero padded, so that paths sort
+# as strings in any collation
+PATH_DIGITS = 10
+
+
+class PhaseQuerySet(TreeQuerySet):
+    """TreeQuerySet whose resolvers run once on the fetched phases"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._resolvers = []
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._resolvers = self._resolvers[:]
+        return clone
+
+    def _fetch_all(self):
+        resolve = self._result_cache is None and self._iterable_class is ModelIterable
+        super()._fetch_all()
+        if resolve:
+            for resolver in self._resolvers:
+                resolver(self._result_cache)
+
+    def with_resolver(self, resolver):
+        clone = self._chain()
+        clone._resolvers.append(resolver)
+        return clone
+
+    def with_tree_fields(self, tree_fields=True):
+        """Tree fields come from stored paths instead of the recursive CTE if
+        TIMELINE_TREE_INDEX is set, phases are then sorted in tree order once
+        fetched"""
+        if not tree_fields or not get_tree_index():
+            return super().with_tree_fields(tree_fields)
+        clone = self._chain()
+        if resolve_tree_fields not in clone._resolvers:
+            # other resolvers rely on tree fields
+            clone._resolvers.insert(0, resolve_tree_fields)
+        return clone
+
+    def ancestors(self, of, *, include_self=False):
+        """Ancestors by the ids in the stored path if TIMELINE_TREE_INDEX is
+        set, without tree fields"""
+        if not get_tree_index():
+            return super().ancestors(of, include_self=include_self)
+        of = get_tree_node(of)
+        ids = get_path_ids(of.path)
+        if include_self:
+            ids.append(of.pk)
+        return self.filter(pk__in=ids).order_by("depth")
+
+    def descendants(self, of, *, include_self=False):
+        """Descendants by a range of stored paths if TIMELINE_TREE_INDEX is
+        set"""
+        if not get_tree_index():
+            return super().descendants(of, include_self=include_self)
+        of = get_tree_node(of)
+        lookup = get_subtree_filter(get_path_prefix(of))
+        if include_self:
+            lookup |= Q(pk=of.pk)
+        return self.filter(lookup).with_tree_fields()
+
+    def with_schedule(self):
+        """Resolves start and end of every phase in one pass"""
+        return self.with_resolver(resolve_schedule).with_tree_fields()
+
+    def with_project_span(self):
+        """Resolves start and end of root phases as projects in one query"""
+        return self.with_resolver(resolve_project_span)
+
+    def with_bar_geometry(self, year, month, project=False, zoom="year"):
+        """Resolves margins and widths of the bars of all phases in the chart
+        window in one pass, project spans if project is True"""
+        return self.with_resolver(
+            partial(
+                resolve_bar_geometry,
+                year=year,
+                month=month,
+                project=project,
+                zoom=zoom,
+            )
+        )
+
+    def with_folding(self, zoom):
+        """Folds phases too short for zoom into summary bars of their parents,
+        phases must be in tree order"""
+        return self.with_resolver(
+            partial(resolve_folding, days=ZOOMS[zoom]["fold_days"])
+        )
+
+    def in_window(self, start, end):
+        """Filters root phases whose project span overlaps start and end,
+        projects without dates never do"""
+        return self.filter(computed_start__lte=end, span_end__gte=start)
+
+    def with_sibling_flags(self):
+        """Annotates whether phases have previous and next siblings"""
+        return self.annotate(
+            has_previous=sibling_exists(position__lt=OuterRef("position")),
+            has_next=sibling_exists(position__gt=OuterRef("position")),
+        )
+
+    def with_sibling_index(self):
+        """Annotates the dense index of phases among their siblings"""
+        return self.annotate(
+            sibling_index=sibling_count(Q(position__lt=OuterRef("position")))
+        )
+
+    def with_tree_labels(self):
+        """Annotates punctuated index and sibling flags for list rendering"""
+        clone = self._chain().with_sibling_flags()
+        if get_position_gap() == 1:
+            if get_tree_index():
+                # resolved along with the tree fields
+                return clone.with_tree_fields()
+            # dense positions are the index itself
+            return clone.tree_fields(tree_positions="position")
+        clone = clone.with_sibling_index().with_resolver(resolve_tree_positions)
+        return clone.with_tree_fields()
+
+
+class PhaseManager(TreeManager.from_queryset(PhaseQuerySet)):
+    """Leaves out soft deleted phases"""
+
+    _with_tree_fields = False
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at=None)
 
 
 class Phase(TreeNode):
@@ -37,60 +192,190 @@ class Phase(TreeNode):
         _("Duration"), default=1, help_text=_("In weeks")
     )
     delay = models.IntegerField(_("Delay"), default=0, help_text=_("In weeks"))
+    computed_start = models.DateField(
+        _("Computed start"), null=True, editable=False, db_index=True
+    )
+    computed_end = models.DateField(
+        _("Computed end"), null=True, editable=False, db_index=True
+    )
+    span_end = models.DateField(
+        _("Project end"), null=True, editable=False, db_index=True
+    )
+    # ids of the ancestors, PATH_DIGITS each, kept on save. Text, so that the
+    # column does not cap the depth of trees
+    path = models.TextField(
+        _("Tree path"),
+        default="",
+        editable=False,
+        db_index=True,
+    )
+    depth = models.PositiveIntegerField(_("Tree depth"), default=0, editable=False)
+    # validates conditional requests of lists, with the count of phases
+    modified = models.DateTimeField(_("Modified"), auto_now=True)
+    # set on the phases of a soft deleted subtree, until restored or purged
+    deleted_at = models.DateTimeField(
+        _("Deleted at"), null=True, editable=False, db_index=True
+    )
+
+    objects = PhaseManager()
+    # soft deleted phases too
+    all_objects = PhaseQuerySet.as_manager()
+
+    # fields that affect computed start and end
+    SCHEDULE_FIELDS = ("parent_id", "start", "duration", "delay")
 
     class Meta:
         verbose_name = _("Phase")
         verbose_name_plural = _("Phases")
         ordering = ["position"]
+        # the unique indexes serve sibling lookups and counts too, soft
+        # deleted phases leave their slot
+        constraints = [
+            models.UniqueConstraint(
+                fields=["parent", "position"],
+                condition=Q(deleted_at=None),
+                name="timeline_phase_unique_position",
+            ),
+            # NULL parents never clash, roots need their own constraint
+            models.UniqueConstraint(
+                fields=["position"],
+                condition=Q(parent=None, deleted_at=None),
+                name="timeline_phase_unique_root_position",
+            ),
+        ]
+        # serves the chart window filter of projects
+        indexes = [
+            models.Index(
+                fields=["parent", "span_end", "computed_start"],
+                name="timeline_phase_window",
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_schedule = {
+            name: value
+            for name, value in zip(field_names, values)
+            if name in cls.SCHEDULE_FIELDS
+        }
+        if "position" in field_names:
+            # the youngest child ends the project span
+            instance._loaded_position = values[field_names.index("position")]
+        return instance
+
     def get_punctuated_index(self):
-        qs = self.ancestors(include_self=True).with_tree_fields()
-        int_list = qs.values_list("position", flat=True)
+        # annotated by PhaseQuerySet.with_tree_labels()
+        if hasattr(self, "tree_positions"):
+            int_list = self.tree_positions
+        elif not self.parent_id and get_position_gap() == 1:
+            int_list = [self.position]
+        else:
+            int_list = Phase.objects.with_tree_labels().get(id=self.id).tree_positions
         str_list = list(map(str, int_list))
         return ".".join(str_list)
 
+    def get_project_id(self):
+        if not self.parent_id:
+            return self.id
+        return get_project_id(self.parent_id)
+
     def get_parent_id(self):
         if not self.parent:
             return None
         return self.parent.id
 
     def get_next_sibling(self):
-        try:
-            next = Phase.objects.get(
-                parent_id=self.get_parent_id(), position=self.position + 1
-            )
-            return next
-        except Phase.DoesNotExist:
-            return None
+        siblings = Phase.objects.filter(
+            parent_id=self.parent_id, position__gt=self.position
+        )
+        return siblings.order_by("position").first()
 
     def get_previous_sibling(self):
-        if self.position == 0:
-            return None
-        prev = Phase.objects.get(
-            parent_id=self.get_parent_id(), position=self.position - 1
+        siblings = Phase.objects.filter(
+            parent_id=self.parent_id, position__lt=self.position
         )
-        return prev
+        return siblings.order_by("position").last()
+
+    def get_sibling_index(self):
+        # annotated by PhaseQuerySet.with_sibling_index()
+        if hasattr(self, "sibling_index"):
+            return self.sibling_index
+        if get_position_gap() == 1:
+            return self.position
+        siblings = Phase.objects.filter(parent_id=self.parent_id)
+        return siblings.filter(position__lt=self.position).count()
+
+    def has_previous_sibling(self):
+        # annotated by PhaseQuerySet.with_sibling_flags()
+        if hasattr(self, "has_previous"):
+            return self.has_previous
+        return self.get_previous_sibling() is not None
+
+    def has_next_sibling(self):
+        # annotated by PhaseQuerySet.with_sibling_flags()
+        if hasattr(self, "has_next"):
+            return self.has_next
+        return self.get_next_sibling() is not None
 
     def move_down(self):
-        next = self.get_next_sibling()
-        if next:
-            self.position += 1
-            self.save()
-            next.position -= 1
-            next.save()
+        self.move_to(self.get_sibling_index() + 1)
 
     def move_up(self):
-        prev = self.get_previous_sibling()
-        if prev:
-            self.position -= 1
+        index = self.get_sibling_index()
+        if index:
+            self.move_to(index - 1)
+
+    def move_to(self, index):
+        """Moves phase to slot index among its siblings.
+
+        With sparse positions only this phase is written, unless siblings
+        have run out of room and need rebalancing.
+        """
+        with transaction.atomic():
+            lock_siblings(self.parent)
+            siblings = Phase.objects.filter(parent_id=self.parent_id)
+            siblings = siblings.exclude(id=self.id)
+            index = min(max(index, 0), siblings.count())
+            if get_position_gap() == 1:
+                # dense positions, shift siblings between old and new slot
+                if index == self.position:
+                    return
+                low, high = sorted([index, self.position])
+                # park this phase too, its slot is taken by the shift
+                moved = Phase.objects.filter(
+                    parent_id=self.parent_id, position__gte=low, position__lte=high
+                )
+                offset = park_siblings(self.parent, moved)
+                step = 1 if index < self.position else -1
+                siblings = siblings.filter(position__gte=offset)
+                siblings.update(position=F("position") - offset + step)
+                self.position = index
+            else:
+                if index == self.get_sibling_index():
+                    return
+                position = get_position_between(siblings, index)
+                if position is None:
+                    rebalance_siblings(self.parent, siblings)
+                    position = get_position_between(siblings, index)
+                self.position = position
             self.save()
-            prev.position += 1
-            prev.save()
+
+    def get_computed_start_end(self):
+        """Dates kept by the scheduling engine, None if changed since loaded"""
+        if self.computed_start and not self.schedule_changed():
+            return self.computed_start, self.computed_end
+        return None
 
     def get_start_end(self):
+        # resolved by PhaseQuerySet.with_schedule()
+        if hasattr(self, "_start_end"):
+            return self._start_end
+        if self.get_computed_start_end():
+            return self.get_computed_start_end()
         start = None
         end = None
         # simple case
@@ -124,13 +409,28 @@ class Phase(TreeNode):
             "start": start,
             "end": end,
         }
+        # resolved by PhaseQuerySet.with_folding()
+        if getattr(self, "folded_count", 0):
+            popup += _(", summarizing %(count)s short phases") % {
+                "count": self.folded_count
+            }
         return popup
 
-    def get_project_popup(self):
-        start, end = self.get_start_end()  # noqa
+    def get_project_start_end(self):
+        # resolved by PhaseQuerySet.with_project_span()
+        if hasattr(self, "_project_start_end"):
+            return self._project_start_end
+        start, end = self.get_start_end()
+        if get_tree_index():
+            # stored paths carry no order, follow the youngest children instead
+            return start, get_project_ends([self.pk]).get(self.pk, end)
         last = self.descendants().last()
         if last:
             last_start, end = last.get_start_end()  # noqa
+        return start, end
+
+    def get_project_popup(self):
+        start, end = self.get_project_start_end()
         popup = _("Type: %(type)s, start: %(start)s, end: %(end)s") % {
             "type": _("Project"),
             "start": start,
@@ -138,68 +438,623 @@ class Phase(TreeNode):
         }
         return popup
 
-    def draw_bar_chart(self, year, month):
-        start, end = self.get_start_end()
-        chart_start, chart_end = get_chart_start_end(year, month)
-        margin, width = get_margin_width(start, end, chart_start, chart_end)
-        margin = str(margin) + "%"
-        width = str(width) + "%"
-        style = (
-            "background-color: %(color)s; margin-left: %(margin)s; width: %(width)s"
-            % {"color": self.phase_type, "margin": margin, "width": width}
-        )
-        return style
+    def get_bar_geometry(self, year, month, project=False, zoom="year"):
+        # resolved by PhaseQuerySet.with_bar_geometry()
+        geometry = getattr(self, "_bar_geometry", {})
+        if (year, month, project, zoom) in geometry:
+            return geometry[(year, month, project, zoom)]
+        if project:
+            start, end = self.get_project_start_end()
+        else:
+            start, end = self.get_start_end()
+        chart_start, chart_end = get_chart_start_end(year, month, zoom)
+        return get_margin_width(start, end, chart_start, chart_end)
 
-    def draw_project_bar_chart(self, year, month):
-        start, end = self.get_start_end()
-        last = self.descendants().last()
-        if last:
-            last_start, end = last.get_start_end()  # noqa
-        chart_start, chart_end = get_chart_start_end(year, month)
-        margin, width = get_margin_width(start, end, chart_start, chart_end)
-        margin = str(margin) + "%"
-        width = str(width) + "%"
-        style = (
-            "background-color: %(color)s; margin-left: %(margin)s; width: %(width)s"
-            % {"color": "#cccccc", "margin": margin, "width": width}
-        )
-        return style
-
-    def create_suite(self):
-        last = self
-        for i in range(1, 10, 1):
-            p = Phase()
-            p.parent = last
-            p.title = self.TYPES[i][1]
-            p.phase_type = self.TYPES[i][0]
-            p.save()
-            last = p
-        return
+    def draw_bar_chart(self, year, month, zoom="year"):
+        margin, width = self.get_bar_geometry(year, month, zoom=zoom)
+        return get_bar_style(self.phase_type, margin, width)
 
-    def save(self, *args, **kwargs):
+    def draw_project_bar_chart(self, year, month, zoom="year"):
+        margin, width = self.get_bar_geometry(year, month, project=True, zoom=zoom)
+        return get_bar_style("#cccccc", margin, width)
+
+    def create_suite(self, nodes=None):
+        """Creates nodes, the default suite if None, after the children this
+        phase already has, that should be locked if others may add some"""
+        if nodes is None:
+            nodes = get_default_suite()
+        create_trees([(self, nodes)], append=True)
+
+    def prepare_dates(self):
         if not self.parent and not self.start:
             self.start = now()
         if self.start:
             self.delay = 0
+
+    def schedule_changed(self):
+        loaded = getattr(self, "_loaded_schedule", None)
+        if self._state.adding or loaded is None:
+            return True
+        if len(loaded) < len(self.SCHEDULE_FIELDS):
+            # some fields were deferred
+            return True
+        return any(getattr(self, name) != loaded[name] for name in loaded)
+
+    def set_computed_schedule(self):
+        """Computes start and end from start date or parent computed end"""
+        start = None
+        if self.start:
+            start = self.start
+        elif self.parent and self.parent.computed_end:
+            start = self.parent.computed_end + timedelta(days=self.delay * 7)
+        self.computed_start = start
+        self.computed_end = None
+        if start:
+            self.computed_end = start + timedelta(days=self.duration * 7)
+
+    def save(self, *args, **kwargs):
+        self.prepare_dates()
+        self.__dict__.pop("_start_end", None)
+        self.__dict__.pop("_project_start_end", None)
+        self.__dict__.pop("_bar_geometry", None)
+        adding = self._state.adding
+        changed = self.schedule_changed()
+        update_fields = {"modified"}
+        if changed:
+            self.set_computed_schedule()
+            update_fields.update(["computed_start", "computed_end"])
+        loaded = getattr(self, "_loaded_schedule", {})
+        moved = adding or loaded.get("parent_id", 0) != self.parent_id
+        if moved:
+            if not adding:
+                prefix, depth = get_path_prefix(self), self.depth
+            self.set_tree_path()
+            update_fields.update(["path", "depth"])
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], *update_fields}
         super(Phase, self).save(*args, **kwargs)
+        self._loaded_schedule = {
+            name: getattr(self, name) for name in self.SCHEDULE_FIELDS
+        }
+        self._loaded_position = self.position
+        if moved and not adding:
+            move_subtree_paths(prefix, get_path_prefix(self), self.depth - depth)
+        if changed and not adding:
+            update_computed_schedule(self)
+
+    def set_tree_path(self):
+        """Stores ids of the ancestors and their count, taken from parent"""
+        if not self.parent_id:
+            self.path, self.depth = "", 0
+            return
+        self.path = get_path_prefix(self.parent)
+        self.depth = self.parent.depth + 1
+
+    def clean(self):
+        super().clean()
+        loaded = getattr(self, "_loaded_schedule", {})
+        if not self.parent_id or loaded.get("parent_id", self.parent_id) == (
+            self.parent_id
+        ):
+            return
+        # the moved branch joins the phases of the new project
+        phases = {
+            phase.pk: phase
+            for phase in Phase(pk=get_project_id(self.parent_id)).descendants(
+                include_self=True
+            )
+        }
+        phases.update((phase.pk, phase) for phase in self.descendants())
+        phases[self.pk] = self
+        dependencies = get_dependencies(phases.values())
+        if not dependencies:
+            return
+        try:
+            get_schedule(list(phases.values()), dependencies)
+        except ValidationError as error:
+            raise ValidationError({"parent": error.messages})
+
+
+class Dependency(models.Model):
+    TYPES = [
+        ("FS", _("Finish to start")),
+        ("SS", _("Start to start")),
+    ]
+
+    predecessor = models.ForeignKey(
+        Phase,
+        on_delete=models.CASCADE,
+        related_name="successor_dependencies",
+        verbose_name=_("Predecessor"),
+    )
+    successor = models.ForeignKey(
+        Phase,
+        on_delete=models.CASCADE,
+        related_name="predecessor_dependencies",
+        verbose_name=_("Successor"),
+    )
+    dependency_type = models.CharField(
+        _("Type"),
+        max_length=2,
+        choices=TYPES,
+        default="FS",
+    )
+    lag = models.IntegerField(_("Lag"), default=0, help_text=_("In weeks"))
+
+    class Meta:
+        verbose_name = _("Dependency")
+        verbose_name_plural = _("Dependencies")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["predecessor", "successor"],
+                name="timeline_dependency_unique",
+            )
+        ]
+
+    def __str__(self):
+        return "%(predecessor)s > %(successor)s" % {
+            "predecessor": self.predecessor,
+            "successor": self.successor,
+        }
+
+    def clean(self):
+        if not self.predecessor_id or not self.successor_id:
+            return
+        if self.predecessor_id == self.successor_id:
+            raise ValidationError(_("A phase can't depend on itself"))
+        project_id = get_project_id(self.successor_id)
+        if get_project_id(self.predecessor_id) != project_id:
+            raise ValidationError(_("Phases must belong to the same project"))
+        phases = list(Phase(pk=project_id).descendants(include_self=True))
+        dependencies = [
+            dependency
+            for dependency in get_dependencies(phases)
+            if dependency.pk != self.pk
+        ]
+        get_schedule(phases, [*dependencies, self])
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_project_schedule(get_project_id(self.successor_id))
+
+    def delete(self, *args, **kwargs):
+        project_id = get_project_id(self.successor_id)
+        deleted = super().delete(*args, **kwargs)
+        update_project_schedule(project_id)
+        return deleted
+
+
+def update_computed_schedule(phase):
+    """Updates computed dates of the phases that follow phase, after phase
+    changed, and the span end of its project"""
+    phases, dependencies = get_following_phases(phase)
+    # outside predecessors and parents hold back with their stored dates
+    fixed = {
+        dependency.predecessor_id: dependency.predecessor
+        for dependency in dependencies
+        if dependency.predecessor_id not in phases
+    }
+    parent_ids = {
+        node.parent_id
+        for node in phases.values()
+        if node.parent_id and node.parent_id not in phases
+    }
+    parents = Phase.objects.filter(pk__in=parent_ids - fixed.keys())
+    fixed.update((parent.pk, parent) for parent in parents)
+    schedule = get_schedule(
+        [*phases.values(), *fixed.values()], dependencies, fixed=fixed
+    )
+    save_schedule(list(phases.values()), schedule)
+    phase.computed_start, phase.computed_end = schedule[phase.pk]
+    project_id = get_path_ids(phase.path)[0] if phase.path else phase.pk
+    if project_id in phases:
+        phase.span_end = phases[project_id].span_end
+    else:
+        update_project_spans([project_id])
+
+
+def get_following_phases(phase):
+    """Phases whose dates follow phase, by id: its subtree and the subtrees
+    of the successors reachable through dependencies. Returns them with the
+    dependencies that hold them back"""
+    phases = {}
+    heads = [phase]
+    while heads:
+        lookup = Q()
+        for head in heads:
+            lookup |= Q(pk=head.pk) | get_subtree_filter(get_path_prefix(head))
+        found = [node for node in Phase.objects.filter(lookup) if node.pk not in phases]
+        phases.update((node.pk, node) for node in found)
+        successors = Dependency.objects.filter(
+            predecessor_id__in=[node.pk for node in found],
+            successor__deleted_at=None,
+        ).select_related("successor")
+        heads = {
+            dependency.successor_id: dependency.successor
+            for dependency in successors
+            if dependency.successor_id not in phases
+        }.values()
+    dependencies = Dependency.objects.filter(
+        successor_id__in=list(phases), predecessor__deleted_at=None
+    )
+    return phases, list(dependencies.select_related("predecessor"))
+
+
+def update_project_schedule(project_id):
+    """Schedules all phases of project with their dependencies, writes the
+    changed dates and the span end of the project. Returns the schedule"""
+    phases = list(Phase(pk=project_id).descendants(include_self=True))
+    schedule = get_schedule(phases, get_dependencies(phases))
+    save_schedule(phases, schedule)
+    return schedule
+
+
+def rebuild_computed_schedule():
+    """Recomputes dates of all phases, returns the number of changed ones"""
+    phases = list(Phase.objects.all())
+    return save_schedule(phases, get_schedule(phases, Dependency.objects.all()))
+
+
+def save_schedule(phases, schedule):
+    """Writes changed computed dates and span ends of root phases, in bulk.
+    Returns the number of phases whose dates changed"""
+    changed = []
+    modified = now()
+    for phase in phases:
+        if schedule[phase.pk] != (phase.computed_start, phase.computed_end):
+            phase.computed_start, phase.computed_end = schedule[phase.pk]
+            # bulk updates skip auto_now
+            phase.modified = modified
+            changed.append(phase)
+    Phase.objects.bulk_update(
+        changed, ["computed_start", "computed_end", "modified"], batch_size=500
+    )
+    ends = get_span_ends(phases, schedule)
+    roots = []
+    for phase in phases:
+        if phase.pk in ends and ends[phase.pk] != phase.span_end:
+            phase.span_end = ends[phase.pk]
+            roots.append(phase)
+    Phase.objects.bulk_update(roots, ["span_end"], batch_size=500)
+    return len(changed)
+
+
+def get_dependencies(phases):
+    """Dependencies whose successors are among phases"""
+    return Dependency.objects.filter(successor_id__in=[phase.pk for phase in phases])
+
+
+def get_schedule(phases, dependencies=(), fixed=()):
+    """Earliest start and end of phases, by id.
+
+    Parent links and dependencies are sorted topologically, so that every
+    phase and link is visited once. A phase starts at its start date, or at
+    the end of its parent plus delay, unless a dependency holds it back.
+    Phases in fixed keep their stored dates. Links from outside phases are
+    ignored, cycles raise ValidationError.
+    """
+    nodes = {phase.pk: phase for phase in phases}
+    links = {pk: [] for pk in nodes}
+    waiting = dict.fromkeys(nodes, 0)
+    for phase in phases:
+        if phase.parent_id in nodes and phase.pk not in fixed:
+            links[phase.parent_id].append((phase.pk, None, phase.delay))
+            waiting[phase.pk] += 1
+    for dependency in dependencies:
+        if (
+            dependency.predecessor_id in nodes
+            and dependency.successor_id in nodes
+            and dependency.successor_id not in fixed
+        ):
+            links[dependency.predecessor_id].append(
+                (dependency.successor_id, dependency.dependency_type, dependency.lag)
+            )
+            waiting[dependency.successor_id] += 1
+    starts = {}
+    bounds = {}
+    schedule = {}
+    queue = deque(pk for pk, count in waiting.items() if not count)
+    while queue:
+        pk = queue.popleft()
+        phase = nodes[pk]
+        if pk in fixed:
+            start, end = phase.computed_start, phase.computed_end
+        else:
+            start = phase.start or starts.get(pk)
+            if start and pk in bounds:
+                start = max(start, bounds[pk])
+            end = start + timedelta(days=phase.duration * 7) if start else None
+        schedule[pk] = (start, end)
+        for successor, dependency_type, lag in links[pk]:
+            if dependency_type is None and end:
+                # parent link, lag is the delay of the child
+                starts[successor] = end + timedelta(days=lag * 7)
+            elif dependency_type and start:
+                anchor = end if dependency_type == "FS" else start
+                bound = anchor + timedelta(days=lag * 7)
+                bounds[successor] = max(bounds.get(successor, bound), bound)
+            waiting[successor] -= 1
+            if not waiting[successor]:
+                queue.append(successor)
+    if len(schedule) < len(nodes):
+        raise ValidationError(
+            _("Dependencies form a cycle between %(phases)s")
+            % {
+                "phases": ", ".join(
+                    str(nodes[pk]) for pk in nodes if pk not in schedule
+                )
+            }
+        )
+    return schedule
+
+
+def get_span_ends(phases, schedule):
+    """End of the last descendant of each root among phases, following the
+    youngest children as the project span query does"""
+    youngest = {}
+    for phase in sorted(phases, key=lambda phase: (phase.position, phase.pk)):
+        youngest[phase.parent_id] = phase
+    ends = {}
+    for phase in phases:
+        if phase.parent_id:
+            continue
+        node = phase
+        while node.pk in youngest:
+            node = youngest[node.pk]
+        ends[phase.pk] = schedule[node.pk][1]
+    return ends
+
+
+def validate_suite_nodes(nodes):
+    """Checks that nodes is a list of phases, each with optional children"""
+    if not isinstance(nodes, list):
+        raise ValidationError(_("Phases must be a list"))
+    fields = {"title", "phase_type", "duration", "delay", "children"}
+    types = [t[0] for t in Phase.TYPES]
+    for node in nodes:
+        if not isinstance(node, dict) or not set(node) <= fields:
+            raise ValidationError(
+                _("Phases can only have %(fields)s")
+                % {"fields": ", ".join(sorted(fields))}
+            )
+        if not node.get("title"):
+            raise ValidationError(_("Every phase needs a title"))
+        if node.get("phase_type", types[0]) not in types:
+            raise ValidationError(
+                _("Unknown type %(type)s") % {"type": node["phase_type"]}
+            )
+        duration = node.get("duration", 1)
+        if not isinstance(duration, int) or duration < 0:
+            raise ValidationError(_("Duration must be a positive integer"))
+        if not isinstance(node.get("delay", 0), int):
+            raise ValidationError(_("Delay must be an integer"))
+        validate_suite_nodes(node.get("children", []))
+
+
+class SuiteTemplate(models.Model):
+    title = models.CharField(
+        _("Name"),
+        max_length=50,
+    )
+    nodes = models.JSONField(
+        _("Phases"),
+        default=list,
+        validators=[validate_suite_nodes],
+        help_text=_("List of phases with title, type, duration, delay and children"),
+    )
+
+    class Meta:
+        verbose_name = _("Suite template")
+        verbose_name_plural = _("Suite templates")
+        ordering = ["title"]
+
+    def __str__(self):
+        return self.title
+
+    def create_projects(self, projects):
+        """Saves unsaved root phases as projects, each with this suite"""
+        projects = list(projects)
+        with transaction.atomic():
+            lock_siblings(None)
+            position = get_position_by_parent(None)
+            for i, project in enumerate(projects):
+                project.parent = None
+                project.position = position + i * get_position_gap()
+                project.prepare_dates()
+                project.set_computed_schedule()
+            bulk_save_phases(projects)
+            create_phases(projects, self.nodes)
+        return projects
 
 
-def get_chart_start_end(year, month):
-    if month < 7:
+def get_default_suite():
+    """Chain of standard phase types, each one child of the previous"""
+    nodes = []
+    for phase_type, title in reversed(Phase.TYPES[1:10]):
+        nodes = [{"title": title, "phase_type": phase_type, "children": nodes}]
+    return nodes
+
+
+def bulk_save_phases(phases):
+    """Inserts new phases in one query, if their ids can be returned"""
+    if connection.features.can_return_rows_from_bulk_insert:
+        Phase.objects.bulk_create(phases)
+    else:
+        for phase in phases:
+            phase.save()
+
+
+def create_phases(parents, nodes):
+    """Creates the tree of nodes under each of parents in tree order.
+
+    Phases are inserted with one bulk_create per level of the tree, parents
+    are expected to have no children yet.
+    """
+    return create_trees([(parent, nodes) for parent in parents])
+
+
+def create_trees(trees, append=False):
+    """Creates each tree of nodes under its parent, with one bulk_create per
+    level of all trees. If append is True, trees follow the children that
+    parents already have, which should be locked"""
+    from .cache import bump_project_version
+
+    level = list(trees)
+    created = []
+    # bulk inserts send no signals
+    project_ids = set()
+    offsets = {}
+    for parent, nodes in trees:
+        project_id = parent.get_project_id()
+        project_ids.add(project_id)
+        bump_project_version(project_id, portfolio=not parent.parent_id)
+        if append:
+            offsets[parent.pk] = get_position_by_parent(parent) - get_position_by_index(
+                0
+            )
+    while level:
+        phases = []
+        next_level = []
+        for parent, children in level:
+            offset = offsets.get(parent.pk, 0)
+            for i, node in enumerate(children):
+                phase = Phase(
+                    parent=parent,
+                    position=get_position_by_index(i) + offset,
+                    title=node["title"],
+                    phase_type=node.get("phase_type", Phase.TYPES[0][0]),
+                    duration=node.get("duration", 1),
+                    start=node.get("start"),
+                    delay=node.get("delay", 0),
+                )
+                phase.set_tree_path()
+                phase.prepare_dates()
+                phase.set_computed_schedule()
+                phases.append(phase)
+                next_level.append((phase, node.get("children", [])))
+        bulk_save_phases(phases)
+        created += phases
+        level = [(phase, children) for phase, children in next_level if children]
+    update_project_spans(project_ids)
+    return created
+
+
+# Chart windows by zoom: months shown, months paged by the arrows, header
+# columns, and days under which phases fold into their parents.
+ZOOMS = {
+    "quarter": {"months": 3, "step": 3, "columns": "weeks", "fold_days": 0},
+    "year": {"months": 12, "step": 6, "columns": "months", "fold_days": 0},
+    "three_years": {"months": 36, "step": 12, "columns": "quarters", "fold_days": 91},
+    "decade": {"months": 120, "step": 60, "columns": "years", "fold_days": 365},
+}
+ZOOM_CHOICES = [
+    ("quarter", _("Quarter")),
+    ("year", _("Year")),
+    ("three_years", _("3 years")),
+    ("decade", _("10 years")),
+]
+
+
+def add_months(day, months):
+    """First day of the month that is months after the month of day"""
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def get_chart_start_end(year, month, zoom="year"):
+    """First and last day of the chart window of zoom that holds month"""
+    if zoom == "quarter":
+        chart_start = date(year, (month - 1) // 3 * 3 + 1, 1)
+    elif zoom == "year":
+        chart_start = date(year, 1 if month < 7 else 7, 1)
+    elif zoom == "three_years":
         chart_start = date(year, 1, 1)
-        chart_end = date(year, 12, 31)
     else:
-        chart_start = date(year, 7, 1)
-        chart_end = date(year + 1, 6, 30)
+        chart_start = date(year - year % 5, 1, 1)
+    chart_end = add_months(chart_start, ZOOMS[zoom]["months"]) - timedelta(days=1)
     return chart_start, chart_end
 
 
+def get_chart_pages(year, month, zoom="year"):
+    """Year and month of the previous and of the next chart window"""
+    chart_start = get_chart_start_end(year, month, zoom)[0]
+    previous = add_months(chart_start, -ZOOMS[zoom]["step"])
+    next = add_months(chart_start, ZOOMS[zoom]["step"])
+    return (previous.year, previous.month), (next.year, next.month)
+
+
+def get_chart_title(year, month, zoom="year"):
+    chart_start, chart_end = get_chart_start_end(year, month, zoom)
+    if zoom == "quarter":
+        return "Q%(quarter)s %(year)s" % {
+            "quarter": (chart_start.month - 1) // 3 + 1,
+            "year": chart_start.year,
+        }
+    if chart_start.year == chart_end.year:
+        return str(chart_start.year)
+    separator = " / " if zoom == "year" else " - "
+    return "%(start)s%(separator)s%(end)s" % {
+        "start": chart_start.year,
+        "separator": separator,
+        "end": chart_end.year,
+    }
+
+
+def get_column_starts(chart_start, chart_end, columns):
+    if columns == "weeks":
+        # columns start on mondays, the first one with the window
+        day = chart_start
+        while day <= chart_end:
+            yield day
+            day += timedelta(days=7 - day.weekday())
+        return
+    months = {"months": 1, "quarters": 3, "years": 12}[columns]
+    day = chart_start
+    while day <= chart_end:
+        yield day
+        day = add_months(day, months)
+
+
+def get_column_label(day, columns):
+    if columns == "weeks":
+        return "W%(week)s" % {"week": day.isocalendar()[1]}
+    if columns == "months":
+        return calendar.month_abbr[day.month]
+    if columns == "quarters":
+        return "Q%(quarter)s %(year)s" % {
+            "quarter": (day.month - 1) // 3 + 1,
+            "year": day.strftime("%y"),
+        }
+    return str(day.year)
+
+
+def get_chart_columns(year, month, zoom="year"):
+    """Header columns of the chart window, with label, position in percent of
+    the window and whether they hold today"""
+    chart_start, chart_end = get_chart_start_end(year, month, zoom)
+    length = (chart_end - chart_start).days + 1
+    columns = ZOOMS[zoom]["columns"]
+    starts = list(get_column_starts(chart_start, chart_end, columns))
+    ends = [day - timedelta(days=1) for day in starts[1:]] + [chart_end]
+    today = now().date()
+    return [
+        {
+            "label": get_column_label(start, columns),
+            "actual": start <= today <= end,
+            "margin": "%g" % round((start - chart_start).days / length * 100, 4),
+            "width": "%g" % round(((end - start).days + 1) / length * 100, 4),
+        }
+        for start, end in zip(starts, ends)
+    ]
+
+
 def get_margin_width(start, end, chart_start, chart_end):
+    length = (chart_end - chart_start).days + 1
     width = 100
     if start <= chart_start:
         margin = 0
     elif start > chart_start and start < chart_end:
-        margin = ((start - chart_start).days + 1) / 365 * 100
+        margin = ((start - chart_start).days + 1) / length * 100
     else:
         margin = 100
         width = 0
@@ -207,40 +1062,570 @@ def get_margin_width(start, end, chart_start, chart_end):
         if end < chart_start:
             width = 0
         elif end < chart_end:
-            width = 100 - margin - (chart_end - end).days / 365 * 100
+            width = 100 - margin - (chart_end - end).days / length * 100
         else:
             width = 100 - margin
     return round(margin, 2), round(width, 2)
 
 
-def get_position_by_parent(parent):
+def get_margins_widths(spans, chart_start, chart_end):
+    """Margins and widths of the bars of (start, end) spans in the chart
+    window, as get_margin_width, in one vectorized pass if numpy is installed.
+    """
+    if numpy is None or not spans:
+        return [
+            get_margin_width(start, end, chart_start, chart_end) for start, end in spans
+        ]
+    days = numpy.fromiter(
+        (day.toordinal() for span in spans for day in span),
+        dtype=float,
+        count=len(spans) * 2,
+    )
+    starts, ends = days[0::2], days[1::2]
+    chart_start, chart_end = chart_start.toordinal(), chart_end.toordinal()
+    length = chart_end - chart_start + 1
+    margin = numpy.where(
+        starts <= chart_start, 0, (starts - chart_start + 1) / length * 100
+    )
+    width = numpy.where(
+        ends < chart_end,
+        100 - margin - (chart_end - ends) / length * 100,
+        100 - margin,
+    )
+    width = numpy.where(ends < chart_start, 0, width)
+    outside = starts >= chart_end
+    margin = numpy.where(outside, 100, margin).round(2)
+    width = numpy.where(outside, 0, width).round(2)
+    return list(zip(margin.tolist(), width.tolist()))
+
+
+def get_bar_style(color, margin, width):
+    return (
+        "background-color: %(color)s; margin-left: %(margin)s%%; width: %(width)s%%"
+        % {
+            "color": color,
+            "margin": "%g" % margin,
+            "width": "%g" % width,
+        }
+    )
+
+
+def resolve_bar_geometry(phases, year, month, project=False, zoom="year"):
+    """Attaches margins and widths of bars to phases, with resolved spans"""
+    if project:
+        spans = [phase.get_project_start_end() for phase in phases]
+    else:
+        spans = [phase.get_start_end() for phase in phases]
+    chart_start, chart_end = get_chart_start_end(year, month, zoom)
+    geometry = get_margins_widths(spans, chart_start, chart_end)
+    for phase, margin_width in zip(phases, geometry):
+        if not hasattr(phase, "_bar_geometry"):
+            phase._bar_geometry = {}
+        phase._bar_geometry[(year, month, project, zoom)] = margin_width
+
+
+def resolve_folding(phases, days):
+    """Folds phases lasting less than days, unless some child is unfolded.
+
+    Phases are visited once, children before parents, and the spans of
+    folded phases are merged into the start and end of the nearest unfolded
+    ancestor, that summarizes them.
+    """
+    if not days:
+        return
+    nodes = {phase.pk for phase in phases}
+    summaries = {}
+    unfolded = set()
+    for phase in reversed(phases):
+        start, end = phase.get_start_end()
+        summary = summaries.pop(phase.pk, None)
+        short = not start or (end - start).days < days
+        phase.folded = phase.parent_id in nodes and short and phase.pk not in unfolded
+        if summary:
+            start, end = merge_spans((start, end), summary[:2])
+        if phase.folded:
+            parent = summaries.get(phase.parent_id, [None, None, 0])
+            count = parent[2] + 1 + (summary[2] if summary else 0)
+            summaries[phase.parent_id] = [*merge_spans(parent[:2], (start, end)), count]
+        else:
+            unfolded.add(phase.parent_id)
+            if summary:
+                phase._start_end = (start, end)
+                phase.folded_count = summary[2]
+
+
+def merge_spans(span, other):
+    """Smallest span holding both, ignoring missing dates"""
+    starts = [day for day in (span[0], other[0]) if day]
+    ends = [day for day in (span[1], other[1]) if day]
+    return min(starts, default=None), max(ends, default=None)
+
+
+def resolve_schedule(phases):
+    """Attaches start and end to phases, resolving every branch only once.
+
+    Ancestors missing from phases are fetched with a single query, provided
+    that phases carry tree fields.
+    """
+    nodes = {phase.pk: phase for phase in phases}
+    missing = set()
+    for phase in phases:
+        if not phase.start and not phase.get_computed_start_end():
+            missing.update(getattr(phase, "tree_path", [])[:-1])
+    missing.difference_update(nodes)
+    if missing:
+        nodes.update((p.pk, p) for p in Phase.objects.filter(pk__in=missing))
+    schedule = {}
+    for phase in phases:
+        phase._start_end = get_resolved_start_end(phase, nodes, schedule)
+
+
+def get_resolved_start_end(phase, nodes, schedule):
+    # climb until a resolved phase or a start date is found
+    chain = []
+    node = phase
+    while node.pk not in schedule:
+        if node.get_computed_start_end():
+            schedule[node.pk] = node.get_computed_start_end()
+            break
+        if node.start:
+            end = node.start + timedelta(days=node.duration * 7)
+            schedule[node.pk] = (node.start, end)
+            break
+        parent = nodes.get(node.parent_id)
+        if parent is None:
+            # no parent or parent unknown, resort to ancestors query
+            schedule[node.pk] = node.get_start_end()
+            break
+        chain.append(node)
+        node = parent
+    # walk back down, each phase starts from parent end plus delay
+    for node in reversed(chain):
+        parent_start, parent_end = schedule[node.parent_id]
+        if not parent_end:
+            schedule[node.pk] = (None, None)
+            continue
+        start = parent_end + timedelta(days=node.delay * 7)
+        schedule[node.pk] = (start, start + timedelta(days=node.duration * 7))
+    return schedule[phase.pk]
+
+
+def sibling_exists(**kwargs):
+    """Subquery telling if siblings of the outer phase match kwargs"""
+    return Case(
+        When(
+            parent__isnull=True,
+            then=Exists(Phase.objects.filter(parent__isnull=True, **kwargs)),
+        ),
+        default=Exists(Phase.objects.filter(parent_id=OuterRef("parent_id"), **kwargs)),
+    )
+
+
+PROJECT_ID_SQL = """
+WITH RECURSIVE chain (id, parent_id) AS (
+    SELECT id, parent_id FROM {table} WHERE id = %s
+    UNION ALL
+    SELECT parent.id, parent.parent_id
+    FROM {table} parent JOIN chain ON parent.id = chain.parent_id
+)
+SELECT id FROM chain WHERE parent_id IS NULL
+"""
+
+
+def get_project_id(phase_id):
+    """Returns the id of the root of phase, climbing only its ancestors"""
+    if get_tree_index():
+        # the first id of the stored path
+        path = Phase.objects.filter(pk=phase_id).values_list("path", flat=True)
+        path = path.first()
+        if path is None:
+            return None
+        return get_path_ids(path)[0] if path else phase_id
+    sql = PROJECT_ID_SQL.format(table=connection.ops.quote_name(Phase._meta.db_table))
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [phase_id])
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+PROJECT_SPAN_SQL = """
+WITH RECURSIVE span (root_id, node_id, depth, anchor, weeks, duration) AS (
+    SELECT id, id, 0, start, 0, duration
+    FROM {table} WHERE id IN ({ids}) AND deleted_at IS NULL
+    UNION ALL
+    SELECT span.root_id, child.id, span.depth + 1,
+        CASE WHEN child.start IS NULL THEN span.anchor ELSE child.start END,
+        CASE WHEN child.start IS NULL
+            THEN span.weeks + span.duration + child.delay ELSE 0 END,
+        child.duration
+    FROM span JOIN {table} child ON child.id = (
+        SELECT youngest.id FROM {table} youngest
+        WHERE youngest.parent_id = span.node_id AND youngest.deleted_at IS NULL
+        ORDER BY youngest.position DESC, youngest.id DESC LIMIT 1
+    )
+)
+SELECT span.root_id, span.anchor, span.weeks + span.duration, node.computed_end
+FROM span JOIN {table} node ON node.id = span.node_id
+ORDER BY span.root_id, span.depth
+"""
+
+
+def get_project_ends(ids):
+    """Returns the end of the last descendant of each phase in ids.
+
+    The recursive query only follows the youngest child of every phase, soft
+    deleted phases are left out. The computed end of the last one is
+    preferred, else start dates are carried down as an anchor plus an offset
+    in weeks.
+    """
+    if not ids:
+        return {}
+    sql = PROJECT_SPAN_SQL.format(
+        table=connection.ops.quote_name(Phase._meta.db_table),
+        ids=", ".join(["%s"] * len(ids)),
+    )
+    start_field = Phase._meta.get_field("start")
+    ends = {}
+    with connection.cursor() as cursor:
+        cursor.execute(sql, list(ids))
+        # rows are sorted by depth, so the last descendant wins
+        for root_id, anchor, weeks, computed_end in cursor.fetchall():
+            anchor = start_field.to_python(anchor)
+            end = start_field.to_python(computed_end)
+            if not end and anchor:
+                end = anchor + timedelta(days=weeks * 7)
+            ends[root_id] = end
+    return ends
+
+
+def resolve_project_span(phases):
+    """Attaches project start and end to phases, querying only those without
+    a stored span"""
+    ends = get_project_ends([phase.pk for phase in phases if not phase.span_end])
+    for phase in phases:
+        start, end = phase.get_start_end()
+        phase._project_start_end = (start, phase.span_end or ends.get(phase.pk, end))
+
+
+def update_project_spans(ids):
+    """Stores the end of each project in ids on its root, returns the ends"""
+    ends = get_project_ends(ids)
+    Phase.objects.bulk_update(
+        [Phase(id=id, span_end=end) for id, end in ends.items()],
+        ["span_end"],
+        batch_size=500,
+    )
+    return ends
+
+
+def sibling_count(*args):
+    """Subquery counting siblings of the outer phase that match args"""
+    siblings = Phase.objects.filter(*args).order_by().values("parent_id")
+    siblings = siblings.annotate(count=Count("id")).values("count")
+    return Coalesce(
+        Case(
+            When(
+                parent__isnull=True,
+                then=Subquery(siblings.filter(parent__isnull=True)),
+            ),
+            default=Subquery(siblings.filter(parent_id=OuterRef("parent_id"))),
+        ),
+        0,
+    )
+
+
+def resolve_tree_positions(phases):
+    """Attaches the path of sibling indexes to phases annotated with them.
+
+    Ancestors missing from phases are fetched with a single query, provided
+    that phases carry tree fields.
+    """
+    nodes = {phase.pk: phase for phase in phases}
+    missing = set()
+    for phase in phases:
+        missing.update(getattr(phase, "tree_path", [])[:-1])
+    missing.difference_update(nodes)
+    if missing:
+        ancestors = Phase.objects.filter(pk__in=missing).with_sibling_index()
+        nodes.update((p.pk, p) for p in ancestors)
+    positions = {}
+    for phase in phases:
+        # climb until a resolved phase or a root is found
+        chain = []
+        node = phase
+        while node is not None and node.pk not in positions:
+            chain.append(node)
+            node = nodes.get(node.parent_id)
+        for node in reversed(chain):
+            parent = positions.get(node.parent_id, [])
+            positions[node.pk] = parent + [node.sibling_index]
+        phase.tree_positions = positions[phase.pk]
+
+
+def get_tree_index():
+    """Whether tree lookups use stored paths instead of the recursive CTE"""
+    return getattr(settings, "TIMELINE_TREE_INDEX", False)
+
+
+def get_path_prefix(phase):
+    """Stored path of the descendants of phase"""
+    return phase.path + "%0*d" % (PATH_DIGITS, phase.pk)
+
+
+def get_path_ids(path):
+    return [int(path[i : i + PATH_DIGITS]) for i in range(0, len(path), PATH_DIGITS)]
+
+
+def get_subtree_filter(prefix):
+    """Paths starting with prefix, as an indexed range. Paths are made of
+    digits only, the next prefix of the same length bounds the range"""
+    upper = "%0*d" % (len(prefix), int(prefix) + 1)
+    return Q(path__gte=prefix, path__lt=upper)
+
+
+def get_project_phases(project):
+    """Phases of project in tree order. The recursive CTE walks only the
+    subtree of project, not the whole portfolio"""
+    lookup = Q(pk=project.pk) | get_subtree_filter(get_path_prefix(project))
+    if get_tree_index():
+        return Phase.objects.filter(lookup).with_tree_fields()
+    return Phase.objects.tree_filter(lookup).with_tree_fields()
+
+
+def get_tree_node(of):
+    """Phase or id of, fetched unless it is a saved phase with its path"""
+    if isinstance(of, Phase) and not of._state.adding and "path" in of.__dict__:
+        return of
+    return Phase.objects.only("path", "depth").get(pk=pk(of))
+
+
+def move_subtree_paths(prefix, new_prefix, depth):
+    """Rewrites the paths of the descendants of a moved phase in one UPDATE"""
+    if prefix == new_prefix:
+        return
+    Phase.all_objects.filter(get_subtree_filter(prefix)).update(
+        path=Concat(
+            Value(new_prefix),
+            Substr("path", len(prefix) + 1),
+            output_field=models.TextField(),
+        ),
+        depth=F("depth") + depth,
+    )
+
+
+def resolve_tree_fields(phases):
+    """Attaches depth, path of ids and ordering to phases from their stored
+    paths, and sorts them in tree order.
+
+    Positions of ancestors missing from phases are fetched with a single
+    query. Siblings have unique positions, the positions of the ancestors
+    order the tree.
+    """
+    positions = {phase.pk: phase.position for phase in phases}
+    missing = set()
+    for phase in phases:
+        phase.tree_path = [*get_path_ids(phase.path), phase.pk]
+        phase.tree_depth = phase.depth
+        missing.update(phase.tree_path)
+    missing.difference_update(positions)
+    if missing:
+        ancestors = Phase.objects.filter(pk__in=missing)
+        positions.update(ancestors.values_list("id", "position"))
+    dense = get_position_gap() == 1
+    for phase in phases:
+        phase.tree_ordering = [positions[id] for id in phase.tree_path]
+        if dense:
+            # dense positions are the index itself
+            phase.tree_positions = phase.tree_ordering
+    phases.sort(key=lambda phase: phase.tree_ordering)
+
+
+def get_position_gap():
+    """Distance between sibling positions, 1 keeps them dense"""
+    return getattr(settings, "TIMELINE_POSITION_GAP", 1)
+
+
+def get_siblings(parent):
     if not parent:
-        return Phase.objects.filter(parent_id=None).count()
-    return parent.children.count()
+        return Phase.objects.filter(parent_id=None)
+    return parent.children.all()
 
 
-def move_younger_siblings(parent, position):
+def lock_siblings(parent):
+    """Locks parent and siblings until the end of the transaction"""
     if not parent:
-        siblings = Phase.objects.filter(parent_id=None, position__gt=position)
+        locked = Phase.objects.filter(parent_id=None)
     else:
-        siblings = parent.children.filter(position__gt=position)
-    for sibling in siblings:
-        sibling.position -= 1
-        sibling.save()
+        locked = Phase.objects.filter(Q(id=parent.id) | Q(parent_id=parent.id))
+    list(locked.select_for_update().values_list("id", flat=True))
+
+
+def get_position_by_parent(parent):
+    gap = get_position_gap()
+    if gap == 1:
+        return get_siblings(parent).count()
+    # leave room in front of the first sibling too
+    last = get_siblings(parent).aggregate(last=Max("position"))["last"]
+    return (last or 0) + gap
+
+
+def get_position_by_index(index):
+    """Evenly spread position, sparse ones leave room in front"""
+    gap = get_position_gap()
+    if gap == 1:
+        return index
+    return (index + 1) * gap
+
+
+def get_position_between(siblings, index):
+    """Returns a free position at slot index of siblings, None if crowded"""
+    positions = siblings.order_by("position", "id")
+    positions = positions.values_list("position", flat=True)
+    if index == 0:
+        after = positions.first()
+        if after is None:
+            return 0
+        return after // 2 if after else None
+    before, *after = positions[index - 1 : index + 1]
+    if not after:
+        return before + get_position_gap()
+    if after[0] - before > 1:
+        return (before + after[0]) // 2
+    return None
+
+
+def park_siblings(parent, siblings, above=0):
+    """Moves siblings past the last child of parent and past position above,
+    in one UPDATE, and returns the offset they were moved by.
+
+    Unique positions are checked row by row, parked siblings can then be
+    written to free slots in any order.
+    """
+    last = get_siblings(parent).aggregate(last=Max("position"))["last"]
+    offset = max(last or 0, above) + 1
+    siblings.update(position=F("position") + offset)
+    return offset
+
+
+def rebalance_siblings(parent, siblings=None):
+    """Spreads positions of siblings a gap apart, keeping their order.
+
+    Children of parent left out of siblings stay parked past the others,
+    until they are given a position of their own.
+    """
+    if siblings is None:
+        siblings = get_siblings(parent)
+    siblings = list(siblings.order_by("position", "id"))
+    park_siblings(parent, get_siblings(parent), get_position_by_index(len(siblings)))
+    for i, sibling in enumerate(siblings):
+        sibling.position = get_position_by_index(i)
+    Phase.objects.bulk_update(siblings, ["position"])
+
+
+def shift_siblings(parent, position, step):
+    """Shifts siblings from position onwards by step, parking them first"""
+    offset = park_siblings(parent, get_siblings(parent).filter(position__gte=position))
+    siblings = get_siblings(parent).filter(position__gte=position + offset)
+    siblings.update(position=F("position") - offset + step)
+
+
+def move_younger_siblings(parent, position):
+    if get_position_gap() > 1:
+        # sparse positions tolerate gaps
+        return
+    with transaction.atomic():
+        lock_siblings(parent)
+        shift_siblings(parent, position + 1, -1)
+
+
+def get_soft_delete():
+    """Whether deleted phases are only flagged, so that they can be restored"""
+    return getattr(settings, "TIMELINE_SOFT_DELETE", False)
+
+
+def get_subtree_phases(phase, manager=None):
+    """Phase and its descendants, by stored path"""
+    manager = manager or Phase.objects
+    return manager.filter(Q(pk=phase.pk) | get_subtree_filter(get_path_prefix(phase)))
+
+
+def raw_delete(queryset):
+    """Deletes rows in one statement, skipping the collector that fetches
+    them to cascade and send signals. Returns the number of deleted rows"""
+    return queryset._raw_delete(queryset.db)
+
+
+def delete_phases(phases):
+    """Deletes phases and their dependencies in two statements"""
+    ids = phases.values("pk")
+    raw_delete(
+        Dependency.objects.filter(Q(predecessor_id__in=ids) | Q(successor_id__in=ids))
+    )
+    return raw_delete(phases)
+
+
+def delete_subtree(phase, soft=None):
+    """Deletes phase and its descendants with set-based statements in one
+    transaction, then closes the gap among siblings.
+
+    Soft deleted phases are flagged with deleted_at, and can be restored
+    until purged. Else phases deleted before are removed too. No signals
+    are sent. Returns the number of deleted phases.
+    """
+    from .cache import bump_project_version
+
+    if soft is None:
+        soft = get_soft_delete()
+    with transaction.atomic():
+        lock_siblings(phase.parent)
+        project_id = phase.get_project_id()
+        if soft:
+            phase.deleted_at = now()
+            count = get_subtree_phases(phase).update(deleted_at=phase.deleted_at)
+        else:
+            count = delete_phases(get_subtree_phases(phase, Phase.all_objects))
+        move_younger_siblings(phase.parent, phase.position)
+        bump_project_version(project_id, portfolio=not phase.parent_id)
+        if phase.parent_id:
+            update_project_schedule(project_id)
+    return count
+
+
+def restore_subtree(phase):
+    """Restores a soft deleted phase with the descendants deleted along, back
+    in its slot among siblings. Returns the number of restored phases"""
+    from .cache import bump_project_version
+
+    with transaction.atomic():
+        lock_siblings(phase.parent)
+        if get_siblings(phase.parent).filter(position=phase.position).exists():
+            # the slot was taken by younger siblings or by a new one
+            shift_siblings(phase.parent, phase.position, get_position_gap())
+        subtree = get_subtree_phases(phase, Phase.all_objects)
+        count = subtree.filter(deleted_at=phase.deleted_at).update(deleted_at=None)
+        phase.deleted_at = None
+        project_id = phase.get_project_id()
+        bump_project_version(project_id, portfolio=not phase.parent_id)
+        if phase.parent_id:
+            update_project_schedule(project_id)
+    return count
+
+
+def purge_phases(before, batch_size=500):
+    """Removes phases soft deleted before a datetime, with their
+    dependencies, a batch at a time. Deepest phases go first, so that no
+    batch leaves children behind. Returns the number of purged phases"""
+    purged = 0
+    while True:
+        with transaction.atomic():
+            ids = Phase.all_objects.filter(deleted_at__lt=before).order_by("-depth")
+            ids = list(ids.values_list("pk", flat=True)[:batch_size])
+            if not ids:
+                return purged
+            purged += delete_phases(Phase.all_objects.filter(pk__in=ids))
 
 
 def get_month_dict(year, month):
-    month_1 = [1, 2, 3, 4, 5, 6]
-    month_2 = [7, 8, 9, 10, 11, 12]
-    if month < 7:
-        months = month_1 + month_2
-    else:
-        year += 1
-        months = month_2 + month_1
-    month_dict = {}
-    for m in months:
-        actual = False
-        if now().year == year and now().month == m:
-            actual = True
-        month_dict[calendar.month_abbr[m]] = actual
-    return month_dict
+    return {
+        column["label"]: column["actual"] for column in get_chart_columns(year, month)
+    }
@@ -4,10 +4,10 @@ register = template.Library()
 
 
 @register.simple_tag
-def draw_bar_chart(phase, year, month):
-    return phase.draw_bar_chart(year, month)
+def draw_bar_chart(phase, year, month, zoom="year"):
+    return phase.draw_bar_chart(year, month, zoom)
 
 
 @register.simple_tag
-def draw_project_bar_chart(phase, year, month):
-    return phase.draw_project_bar_chart(year, month)
+def draw_project_bar_chart(phase, year, month, zoom="year"):
+    return phase.draw_project_bar_chart(year, month, zoom)
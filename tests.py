@@ -1,19 +1,53 @@
 import calendar
+import json
 from datetime import date, timedelta
+from importlib import import_module, reload
+from io import StringIO
+from unittest import mock
 
-from django.test import TestCase, override_settings
-from django.urls import reverse
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, modify_settings, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import clear_url_caches, resolve, reverse
 from django.utils.timezone import now
 
+from . import urls as timeline_urls
+from .benchmarks import make_portfolio, run_benchmarks
 from .factories import PhaseDelayFactory, PhaseStartFactory
+from .forms import PhaseCreateForm
+from .imports import import_tree, read_tree
 from .models import (
+    PATH_DIGITS,
+    Dependency,
     Phase,
+    SuiteTemplate,
+    delete_subtree,
+    get_chart_columns,
+    get_chart_pages,
     get_chart_start_end,
+    get_chart_title,
     get_margin_width,
+    get_margins_widths,
     get_month_dict,
+    get_path_ids,
     get_position_by_parent,
+    get_project_ends,
+    get_project_id,
+    get_schedule,
     move_younger_siblings,
+    purge_phases,
+    rebuild_computed_schedule,
+    restore_subtree,
+    validate_suite_nodes,
 )
+from .views.export import EXPORT_FIELDS
+from .views.phase import AsyncPhaseListView, get_swap_ranges
 
 
 @override_settings(USE_I18N=False)
@@ -127,10 +161,77 @@ class PhaseModelTest(TestCase):
         print("\n-Test get month dict")
 
     def test_draw_bar_chart(self):
-        phase = Phase.objects.create(title="Foo", start=date(2023, 4, 13))
+        phase = Phase.objects.create(title="Foo", position=1, start=date(2023, 4, 13))
         style = "background-color: #dddddd; margin-left: 28.22%; width: 1.92%"
         self.assertEquals(phase.draw_bar_chart(2023, 1), style)
         print("\n-Test draw bar chart")
+        phase = Phase.objects.with_bar_geometry(2023, 1).get(id=phase.id)
+        self.assertEquals(phase._bar_geometry[(2023, 1, False, "year")], (28.22, 1.92))
+        self.assertEquals(phase.draw_bar_chart(2023, 1), style)
+        print("\n-Test draw bar chart from resolved geometry")
+
+    def test_get_margins_widths(self):
+        chst, chen = get_chart_start_end(2023, 1)
+        days = [date(2022, 12, 1) + timedelta(days=d) for d in range(0, 420, 7)]
+        spans = [(start, end) for start in days for end in days if start <= end]
+        expected = [get_margin_width(s, e, chst, chen) for s, e in spans]
+        self.assertEquals(get_margins_widths(spans, chst, chen), expected)
+        with mock.patch("timeline.models.numpy", None):
+            self.assertEquals(get_margins_widths(spans, chst, chen), expected)
+        self.assertEquals(get_margins_widths([], chst, chen), [])
+        print("\n-Test batch margins and widths")
+
+
+class PhaseScheduleTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        print("\nTest timeline schedule resolver")
+        parent = PhaseStartFactory(title="Parent")
+        first = PhaseDelayFactory.create(parent=parent, title="First")
+        PhaseDelayFactory.create(parent=first, title="Child")
+        PhaseStartFactory.create(parent=first, position=1, title="Fixed")
+        PhaseDelayFactory.create(parent=parent, position=1, title="Last")
+
+    def test_with_schedule(self):
+        parent = Phase.objects.get(title="Parent")
+        expected = {p.id: p.get_start_end() for p in Phase.objects.all()}
+        with self.assertNumQueries(1):
+            phases = list(parent.descendants(include_self=True).with_schedule())
+            for phase in phases:
+                self.assertEquals(phase.get_start_end(), expected[phase.id])
+        print("\n-Test schedule resolved in one query")
+
+    def test_with_schedule_missing_ancestors(self):
+        first = Phase.objects.get(title="First")
+        child = Phase.objects.get(title="Child")
+        with self.assertNumQueries(1):
+            phases = list(first.descendants().with_schedule())
+        self.assertEquals(phases[0].get_start_end(), child.get_start_end())
+        print("\n-Test schedule read from computed dates")
+        Phase.objects.update(computed_start=None, computed_end=None)
+        with self.assertNumQueries(2):
+            phases = list(first.descendants().with_schedule())
+        self.assertEquals(phases[0].get_start_end(), child.get_start_end())
+        print("\n-Test schedule with missing ancestors")
+
+    def test_with_project_span(self):
+        other = PhaseStartFactory(title="Other", position=1)
+        PhaseStartFactory.create(parent=other, title="Fixed child")
+        expected = {
+            p.id: p.get_project_start_end()
+            for p in Phase.objects.filter(parent_id=None)
+        }
+        with self.assertNumQueries(1):
+            roots = list(Phase.objects.filter(parent_id=None).with_project_span())
+            for root in roots:
+                self.assertEquals(root.get_project_start_end(), expected[root.id])
+        print("\n-Test project span read from stored span end")
+        Phase.objects.update(span_end=None)
+        with self.assertNumQueries(2):
+            roots = list(Phase.objects.filter(parent_id=None).with_project_span())
+            for root in roots:
+                self.assertEquals(root.get_project_start_end(), expected[root.id])
+        print("\n-Test project span resolved in two queries")
 
 
 class PhaseModifiedModelTest(TestCase):
@@ -159,15 +260,981 @@ class PhaseModifiedModelTest(TestCase):
 
     def test_move_younger_siblings(self):
         parent = Phase.objects.get(title="Parent")
+        Phase.objects.get(title="First").delete()
         move_younger_siblings(parent, 0)
         pha1 = Phase.objects.get(title="Last")
         self.assertEquals(pha1.position, 0)
         print("\n-Test move younger children")
+        parent.delete()
         move_younger_siblings(None, 0)
         pha1 = Phase.objects.get(title="Uncle")
         self.assertEquals(pha1.position, 0)
         print("\n-Test move younger roots")
 
+    def test_move_younger_siblings_single_update(self):
+        parent = Phase.objects.get(title="Parent")
+        for i in range(2, 10):
+            PhaseDelayFactory.create(parent=parent, position=i)
+        Phase.objects.get(title="First").delete()
+        with CaptureQueriesContext(connection) as ctx:
+            move_younger_siblings(parent, 0)
+        updates = [q for q in ctx.captured_queries if q["sql"].startswith("UPDATE")]
+        # parked past the last sibling, then shifted into place
+        self.assertEquals(len(updates), 2)
+        positions = parent.children.values_list("position", flat=True)
+        self.assertEquals(list(positions), [0, 1, 2, 3, 4, 5, 6, 7, 8])
+        print("\n-Test move younger siblings in two updates")
+
+
+@override_settings(TIMELINE_POSITION_GAP=1024)
+class PhaseSparsePositionTest(TestCase):
+    def setUp(self):
+        print("\nTest timeline sparse positions")
+        parent = PhaseStartFactory(title="Parent")
+        for title in ["First", "Second", "Third"]:
+            PhaseDelayFactory.create(
+                parent=parent, title=title, position=get_position_by_parent(parent)
+            )
+
+    def test_get_position_by_parent(self):
+        parent = Phase.objects.get(title="Parent")
+        self.assertEquals(get_position_by_parent(parent), 4096)
+        print("\n-Test sparse position by parent")
+
+    def test_move_to(self):
+        pha2 = Phase.objects.get(title="Third")
+        with CaptureQueriesContext(connection) as ctx:
+            pha2.move_to(0)
+        updates = [
+            q
+            for q in ctx.captured_queries
+            if q["sql"].startswith("UPDATE") and '"position"' in q["sql"]
+        ]
+        self.assertEquals(len(updates), 1)
+        parent = Phase.objects.get(title="Parent")
+        titles = parent.children.values_list("title", flat=True)
+        self.assertEquals(list(titles), ["Third", "First", "Second"])
+        print("\n-Test sparse move writes one row")
+        for i in range(12):
+            Phase.objects.get(title="Second").move_up()
+            Phase.objects.get(title="Second").move_down()
+        titles = parent.children.values_list("title", flat=True)
+        self.assertEquals(list(titles), ["Third", "First", "Second"])
+        print("\n-Test sparse moves rebalance when crowded")
+
+    def test_punctuated_index(self):
+        pha1 = Phase.objects.get(title="Second")
+        self.assertEquals(pha1.get_punctuated_index(), "0.1")
+        parent = Phase.objects.get(title="Parent")
+        qs = parent.descendants(include_self=True).with_tree_labels()
+        labels = [p.get_punctuated_index() for p in qs]
+        self.assertEquals(labels, ["0", "0.0", "0.1", "0.2"])
+        print("\n-Test sparse punctuated index")
+
+
+class PhaseUniquePositionTest(TestCase):
+    def setUp(self):
+        print("\nTest timeline unique positions")
+        self.parent = PhaseStartFactory(title="Parent")
+        for i, title in enumerate(["First", "Second", "Third"]):
+            PhaseDelayFactory.create(parent=self.parent, title=title, position=i)
+
+    def test_unique_position(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            PhaseDelayFactory.create(parent=self.parent, position=1)
+        print("\n-Test siblings can't share a position")
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            PhaseStartFactory(title="Other")
+        print("\n-Test projects can't share a position")
+
+    def test_move_to(self):
+        Phase.objects.get(title="Third").move_to(0)
+        Phase.objects.get(title="First").move_to(2)
+        titles = self.parent.children.values_list("title", flat=True)
+        self.assertEquals(list(titles), ["Third", "Second", "First"])
+        positions = self.parent.children.values_list("position", flat=True)
+        self.assertEquals(list(positions), [0, 1, 2])
+        print("\n-Test dense moves keep positions unique")
+
+    def test_repair_positions(self):
+        migration = import_module("timeline.migrations.0008_phase_unique_position")
+        Phase.objects.filter(title="Third").update(position=7)
+        Phase.objects.filter(title="Second").update(position=3)
+        migration.repair_positions(apps, None)
+        positions = self.parent.children.values_list("position", flat=True)
+        self.assertEquals(list(positions), [0, 1, 2])
+        print("\n-Test migration closes gaps of dense positions")
+
+    @override_settings(TIMELINE_POSITION_GAP=1024)
+    def test_rebalance_command(self):
+        out = StringIO()
+        call_command("rebalance_phases", stdout=out)
+        self.assertIn("Rebalanced 2 sibling sets", out.getvalue())
+        positions = self.parent.children.values_list("position", flat=True)
+        self.assertEquals(list(positions), [1024, 2048, 3072])
+        self.assertEquals(Phase.objects.get(title="Parent").position, 1024)
+        print("\n-Test rebalance command spreads positions a gap apart")
+
+
+class PhaseTreeIndexTest(TestCase):
+    def setUp(self):
+        print("\nTest timeline stored tree paths")
+        self.parent = PhaseStartFactory(title="Parent")
+        first = PhaseDelayFactory.create(parent=self.parent, title="First")
+        PhaseDelayFactory.create(parent=first, title="Child")
+        PhaseDelayFactory.create(parent=self.parent, position=1, title="Last")
+        PhaseStartFactory(title="Other", position=1)
+
+    def assertPaths(self):
+        for phase in Phase.objects.with_tree_fields():
+            self.assertEquals(get_path_ids(phase.path), phase.tree_path[:-1])
+            self.assertEquals(phase.depth, phase.tree_depth)
+
+    @override_settings(TIMELINE_TREE_INDEX=True)
+    def test_deep_tree(self):
+        other = phase = Phase.objects.get(title="Other")
+        for i in range(60):
+            phase = PhaseDelayFactory.create(parent=phase)
+        self.assertEquals(phase.depth, 60)
+        self.assertEquals(len(phase.path), 60 * PATH_DIGITS)
+        self.assertEquals(len(phase.ancestors()), 60)
+        self.assertEquals(other.descendants().count(), 60)
+        print("\n-Test paths of trees deeper than 50 levels")
+
+    def test_paths(self):
+        self.assertPaths()
+        child = Phase.objects.get(title="Child")
+        self.assertEquals(child.depth, 2)
+        print("\n-Test paths stored on creation")
+        self.parent.create_suite()
+        self.assertPaths()
+        print("\n-Test paths stored on bulk creation")
+        first = Phase.objects.get(title="First")
+        first.parent = Phase.objects.get(title="Other")
+        first.save()
+        self.assertPaths()
+        first.parent = None
+        first.position = 2
+        first.save()
+        self.assertPaths()
+        self.assertEquals(Phase.objects.get(title="Child").depth, 1)
+        print("\n-Test paths of descendants moved along")
+
+    def test_store_paths(self):
+        migration = import_module("timeline.migrations.0009_phase_path_depth")
+        Phase.objects.update(path="", depth=0)
+        migration.store_paths(apps, None)
+        self.assertPaths()
+        print("\n-Test migration stores paths")
+
+    def test_tree_index(self):
+        self.parent.create_suite()
+        leaf = Phase.objects.get(title="Maintenance design")
+        descendants = list(self.parent.descendants(include_self=True))
+        ancestors = list(leaf.ancestors())
+        labels = list(self.parent.descendants().with_tree_labels())
+        with override_settings(TIMELINE_TREE_INDEX=True):
+            with self.assertNumQueries(1):
+                self.assertEquals(
+                    list(self.parent.descendants(include_self=True)), descendants
+                )
+            with self.assertNumQueries(1):
+                self.assertEquals(list(leaf.ancestors()), ancestors)
+            phases = self.parent.descendants().with_tree_labels()
+            self.assertEquals(
+                [(p.get_punctuated_index(), p.tree_depth) for p in phases],
+                [(p.get_punctuated_index(), p.tree_depth) for p in labels],
+            )
+            self.assertEquals(get_project_id(leaf.id), self.parent.id)
+            print("\n-Test lookups by stored paths match the recursive CTE")
+            url = reverse(
+                "timeline:list",
+                kwargs={"pk": self.parent.id, "year": 2023, "month": 1},
+            )
+            response = self.client.get(url)
+            self.assertContains(response, "0.2.0.0.0.0.0.0.0.0 -")
+            print("\n-Test list by stored paths")
+
+
+class PhaseSubtreeDeleteTest(TestCase):
+    def setUp(self):
+        print("\nTest timeline subtree delete")
+        cache.clear()
+        parent = PhaseStartFactory(title="Parent")
+        first = PhaseDelayFactory.create(parent=parent, title="First")
+        child = PhaseDelayFactory.create(parent=first, title="Child")
+        PhaseDelayFactory.create(parent=child, title="Grandchild")
+        last = PhaseDelayFactory.create(parent=parent, position=1, title="Last")
+        Dependency.objects.create(predecessor=child, successor=last)
+
+    def test_delete_subtree(self):
+        first = Phase.objects.get(title="First")
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEquals(delete_subtree(first, soft=False), 3)
+        deletes = [q for q in ctx.captured_queries if q["sql"].startswith("DELETE")]
+        self.assertEquals(len(deletes), 2)
+        print("\n-Test subtree deleted in two statements")
+        self.assertEquals(Phase.all_objects.count(), 2)
+        self.assertEquals(Dependency.objects.count(), 0)
+        self.assertEquals(Phase.objects.get(title="Last").position, 0)
+        print("\n-Test subtree delete renumbers siblings")
+
+    def test_soft_delete_and_restore(self):
+        parent = Phase.objects.get(title="Parent")
+        first = Phase.objects.get(title="First")
+        grandchild = Phase.objects.get(title="Grandchild")
+        delete_subtree(grandchild, soft=True)
+        self.assertEquals(delete_subtree(first, soft=True), 2)
+        self.assertEquals(list(parent.descendants()), [Phase.objects.get(title="Last")])
+        self.assertEquals(Phase.all_objects.filter(deleted_at__isnull=False).count(), 3)
+        self.assertEquals(Phase.objects.get(title="Last").position, 0)
+        print("\n-Test soft deleted subtree hidden")
+        PhaseDelayFactory.create(parent=parent, position=1, title="Added")
+        first = Phase.all_objects.get(title="First")
+        self.assertEquals(restore_subtree(first), 2)
+        titles = [phase.title for phase in parent.children.order_by("position")]
+        self.assertEquals(titles, ["First", "Last", "Added"])
+        self.assertTrue(Phase.objects.filter(title="Child").exists())
+        self.assertFalse(Phase.objects.filter(title="Grandchild").exists())
+        print("\n-Test restored in its slot, without phases deleted before")
+        delete_subtree(first, soft=False)
+        self.assertEquals(Phase.all_objects.count(), 3)
+        print("\n-Test delete removes soft deleted descendants")
+
+    def test_purge(self):
+        delete_subtree(Phase.objects.get(title="First"), soft=True)
+        self.assertEquals(purge_phases(now() - timedelta(days=1)), 0)
+        self.assertEquals(purge_phases(now(), batch_size=1), 3)
+        self.assertEquals(Phase.all_objects.count(), 2)
+        self.assertEquals(Dependency.objects.count(), 0)
+        print("\n-Test purge soft deleted phases in batches")
+        out = StringIO()
+        call_command("purge_phases", stdout=out)
+        self.assertIn("Purged 0 phases", out.getvalue())
+        print("\n-Test purge command")
+
+    @override_settings(TIMELINE_SOFT_DELETE=True)
+    def test_restore_view(self):
+        first = Phase.objects.get(title="First")
+        restore_url = reverse("timeline:restore", kwargs={"pk": first.id})
+        self.client.post(
+            reverse("timeline:delete", kwargs={"pk": first.id}),
+            headers={"hx-request": "true"},
+        )
+        response = self.client.get(
+            reverse("timeline:detail", kwargs={"pk": first.id}),
+            headers={"hx-request": "true"},
+        )
+        self.assertEqual(response.status_code, 404)
+        print("\n-Test soft deleted phase not found")
+        parent = Phase.objects.get(title="Parent")
+        response = self.client.get(
+            reverse("timeline:list", kwargs={"pk": parent.id, "year": 2023, "month": 1})
+        )
+        self.assertContains(response, restore_url)
+        print("\n-Test delete message with undo")
+        response = self.client.get(restore_url, headers={"hx-request": "true"})
+        self.assertTemplateUsed(response, "timeline/htmx/restore_confirm.html")
+        self.assertFalse(Phase.objects.filter(title="First").exists())
+        print("\n-Test restore view confirms on GET")
+        response = self.client.post(restore_url, headers={"hx-request": "true"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "timeline/htmx/restore.html")
+        self.assertEqual(Phase.objects.get(title="First").position, 0)
+        print("\n-Test restore view")
+        response = self.client.post(restore_url, headers={"hx-request": "true"})
+        self.assertEqual(response.status_code, 404)
+        print("\n-Test restore view of a phase not deleted")
+
+
+class PhaseComputedScheduleTest(TestCase):
+    def setUp(self):
+        print("\nTest timeline computed schedule")
+        parent = PhaseStartFactory(title="Parent")
+        first = PhaseDelayFactory.create(parent=parent, title="First")
+        PhaseDelayFactory.create(parent=first, title="Child")
+        fixed = PhaseStartFactory.create(parent=first, position=1, title="Fixed")
+        PhaseDelayFactory.create(parent=fixed, title="Grandchild")
+        PhaseDelayFactory.create(parent=parent, position=1, title="Last")
+
+    def assertComputed(self):
+        for phase in Phase.objects.all():
+            computed = (phase.computed_start, phase.computed_end)
+            # walk the tree instead of reading computed dates
+            phase.computed_start = None
+            self.assertEquals(computed, phase.get_start_end())
+
+    def test_computed_on_create(self):
+        self.assertComputed()
+        print("\n-Test computed dates on create")
+
+    def test_computed_on_change(self):
+        parent = Phase.objects.get(title="Parent")
+        parent.duration += 3
+        with CaptureQueriesContext(connection) as ctx:
+            parent.save()
+        updates = [
+            q
+            for q in ctx.captured_queries
+            if q["sql"].startswith("UPDATE") and '"computed_start"' in q["sql"]
+        ]
+        self.assertEquals(len(updates), 2)
+        self.assertComputed()
+        print("\n-Test computed dates on change, in bulk")
+        first = Phase.objects.get(title="First")
+        first.parent = Phase.objects.get(title="Last")
+        first.delay = 2
+        first.save()
+        self.assertComputed()
+        print("\n-Test computed dates on reparent")
+
+    def test_rebuild_schedule(self):
+        Phase.objects.update(computed_start=None, computed_end=None)
+        call_command("rebuild_schedule", stdout=StringIO())
+        self.assertComputed()
+        print("\n-Test rebuild schedule command")
+
+
+class PhaseDependencyTest(TestCase):
+    def setUp(self):
+        print("\nTest timeline phase dependencies")
+        parent = Phase.objects.create(title="Parent", start=date(2024, 1, 1))
+        Phase.objects.create(parent=parent, title="First", duration=2)
+        Phase.objects.create(parent=parent, position=1, title="Second", duration=3)
+        Phase.objects.create(
+            parent=parent, position=2, title="Fixed", start=date(2024, 1, 8)
+        )
+
+    def test_get_schedule(self):
+        phases = {phase.title: phase for phase in Phase.objects.all()}
+        first, second = phases["First"], phases["Second"]
+        schedule = get_schedule(phases.values())
+        self.assertEquals(schedule[second.id], (date(2024, 1, 8), date(2024, 1, 29)))
+        print("\n-Test schedule without dependencies")
+        fs = Dependency(predecessor=first, successor=second, lag=1)
+        schedule = get_schedule(phases.values(), [fs])
+        self.assertEquals(schedule[second.id], (date(2024, 1, 29), date(2024, 2, 19)))
+        print("\n-Test finish to start dependency with lag")
+        ss = Dependency(predecessor=first, successor=second, dependency_type="SS")
+        schedule = get_schedule(phases.values(), [ss])
+        self.assertEquals(schedule[second.id][0], date(2024, 1, 8))
+        print("\n-Test start to start dependency")
+        fixed = Dependency(predecessor=second, successor=phases["Fixed"])
+        schedule = get_schedule(phases.values(), [fixed])
+        self.assertEquals(schedule[phases["Fixed"].id][0], date(2024, 1, 29))
+        print("\n-Test fixed start held back by dependency")
+        back = Dependency(predecessor=second, successor=first)
+        with self.assertRaises(ValidationError):
+            get_schedule(phases.values(), [fs, back])
+        print("\n-Test dependency cycle")
+
+    def test_dependency_save(self):
+        first = Phase.objects.get(title="First")
+        second = Phase.objects.get(title="Second")
+        dependency = Dependency(predecessor=first, successor=second)
+        dependency.full_clean()
+        dependency.save()
+        second.refresh_from_db()
+        self.assertEquals(second.computed_start, date(2024, 1, 22))
+        self.assertEquals(second.get_start_end()[0], date(2024, 1, 22))
+        print("\n-Test dependency moves successor")
+        fixed = Phase.objects.get(title="Fixed")
+        Dependency.objects.create(predecessor=second, successor=fixed)
+        parent = Phase.objects.get(title="Parent")
+        self.assertEquals(parent.get_project_start_end()[1], date(2024, 2, 19))
+        print("\n-Test dependency moves project end")
+        first.duration = 4
+        first.save()
+        second.refresh_from_db()
+        self.assertEquals(second.computed_start, date(2024, 2, 5))
+        print("\n-Test successor follows predecessor change")
+        dependency.delete()
+        second.refresh_from_db()
+        self.assertEquals(second.computed_start, date(2024, 1, 8))
+        print("\n-Test dependency delete frees successor")
+
+    def test_reschedule_follows_changes(self):
+        first = Phase.objects.get(title="First")
+        second = Phase.objects.get(title="Second")
+        Dependency.objects.create(predecessor=first, successor=second)
+        fixed = Phase.objects.get(title="Fixed")
+        Dependency.objects.create(predecessor=second, successor=fixed)
+        first.title = "Renamed"
+        with CaptureQueriesContext(connection) as ctx:
+            first.save()
+        sqls = [query["sql"] for query in ctx.captured_queries]
+        self.assertFalse(any("timeline_dependency" in sql for sql in sqls))
+        self.assertFalse(any("RECURSIVE span" in sql for sql in sqls))
+        print("\n-Test title change skips the reschedule")
+        first.duration = 4
+        with CaptureQueriesContext(connection) as ctx:
+            first.save()
+        # the project is not walked, only the subtrees that follow
+        self.assertFalse(
+            any("__tree" in query["sql"] for query in ctx.captured_queries)
+        )
+        fixed.refresh_from_db()
+        self.assertEquals(fixed.computed_start, date(2024, 2, 26))
+        self.assertEquals(Phase.objects.get(title="Parent").span_end, date(2024, 3, 4))
+        self.assertEquals(rebuild_computed_schedule(), 0)
+        print("\n-Test reschedule reaches successors of successors and the span")
+
+    def test_dependency_clean(self):
+        first = Phase.objects.get(title="First")
+        second = Phase.objects.get(title="Second")
+        Dependency.objects.create(predecessor=first, successor=second)
+        with self.assertRaises(ValidationError):
+            Dependency(predecessor=second, successor=first).full_clean()
+        print("\n-Test dependency cycle rejected")
+        with self.assertRaises(ValidationError):
+            Dependency(predecessor=first, successor=first).full_clean()
+        print("\n-Test self dependency rejected")
+        other = Phase.objects.create(title="Other", position=1)
+        with self.assertRaises(ValidationError):
+            Dependency(predecessor=other, successor=first).full_clean()
+        print("\n-Test dependency across projects rejected")
+        first.parent = second
+        with self.assertRaises(ValidationError):
+            first.clean()
+        print("\n-Test reparent into a dependency cycle rejected")
+
+
+class SuiteTemplateTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        print("\nTest timeline suite templates")
+        SuiteTemplate.objects.create(
+            title="Tree",
+            nodes=[
+                {
+                    "title": "Design",
+                    "duration": 4,
+                    "children": [
+                        {"title": "Concept", "duration": 2},
+                        {"title": "Details", "delay": 1},
+                    ],
+                },
+                {"title": "Works", "phase_type": "#9561e2", "duration": 20},
+            ],
+        )
+
+    def test_standard_suite(self):
+        suite = SuiteTemplate.objects.get(title="Standard suite")
+        suite.full_clean()
+        project = PhaseStartFactory(title="Project")
+        # plus the first free position, the project span query and update
+        with self.assertNumQueries(12):
+            project.create_suite(suite.nodes)
+        last = project.descendants().last()
+        self.assertEquals(last.title, "Maintenance design")
+        self.assertEquals(last.tree_depth, 9)
+        print("\n-Test standard suite, one query per level")
+
+    def test_create_suite(self):
+        project = PhaseStartFactory(title="Project")
+        project.create_suite()
+        titles = project.descendants().values_list("title", flat=True)
+        self.assertEquals(titles[0], "Feasibility study")
+        self.assertEquals(len(titles), 9)
+        print("\n-Test default suite")
+
+    def test_create_projects(self):
+        suite = SuiteTemplate.objects.get(title="Tree")
+        projects = [Phase(title="P%(i)s" % {"i": i}) for i in range(10)]
+        with self.assertNumQueries(9):
+            suite.create_projects(projects)
+        self.assertEquals(Phase.objects.filter(parent_id=None).count(), 10)
+        self.assertEquals(Phase.objects.count(), 50)
+        project = Phase.objects.get(title="P9")
+        self.assertEquals(project.position, 9)
+        self.assertIsNotNone(project.start)
+        details = project.descendants().get(title="Details")
+        self.assertEquals(details.get_punctuated_index(), "9.0.1")
+        self.assertEquals(details.delay, 1)
+        print("\n-Test create projects from suite")
+
+    def test_validate_suite_nodes(self):
+        validate_suite_nodes([{"title": "Foo", "children": []}])
+        for nodes in [
+            {"title": "Foo"},
+            [{"title": ""}],
+            [{"title": "Foo", "colour": "red"}],
+            [{"title": "Foo", "phase_type": "#000000"}],
+            [{"title": "Foo", "children": [{"title": "Bar", "duration": "2"}]}],
+        ]:
+            with self.assertRaises(ValidationError):
+                validate_suite_nodes(nodes)
+        print("\n-Test validate suite nodes")
+
+
+class PhaseCacheTest(TestCase):
+    def setUp(self):
+        print("\nTest timeline fragment cache")
+        cache.clear()
+        parent = PhaseStartFactory(title="Parent")
+        PhaseDelayFactory.create(parent=parent, title="First")
+        PhaseDelayFactory.create(parent=parent, position=1, title="Last")
+
+    def test_phase_list_cache(self):
+        parent = Phase.objects.get(title="Parent")
+        url = reverse(
+            "timeline:list", kwargs={"pk": parent.id, "year": 2023, "month": 1}
+        )
+        self.client.get(url)
+        # the project, and the validator of conditional requests
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertContains(response, "First")
+        print("\n-Test phase list served from cache")
+        with self.captureOnCommitCallbacks(execute=True):
+            PhaseDelayFactory.create(parent=parent, position=2, title="Added")
+        response = self.client.get(url)
+        self.assertContains(response, "Added")
+        print("\n-Test phase list cache invalidated on save")
+        with self.captureOnCommitCallbacks(execute=True):
+            Phase.objects.get(title="Added").delete()
+        response = self.client.get(url)
+        self.assertNotContains(response, "Added")
+        print("\n-Test phase list cache invalidated on delete")
+
+    def test_project_list_cache(self):
+        url = reverse("timeline:project_list", kwargs={"year": 2023, "month": 1})
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            phase = Phase.objects.get(title="Last")
+            phase.duration += 50
+            phase.save()
+        parent = Phase.objects.get(title="Parent")
+        popup = parent.get_project_popup()
+        response = self.client.get(url)
+        self.assertContains(response, popup)
+        print("\n-Test project row cache invalidated by a descendant")
+
+
+class PhaseConditionalListTest(TestCase):
+    def setUp(self):
+        print("\nTest timeline conditional list responses")
+        cache.clear()
+        parent = PhaseStartFactory(title="Parent")
+        PhaseDelayFactory.create(parent=parent, title="First")
+        PhaseDelayFactory.create(parent=parent, position=1, title="Last")
+
+    def test_phase_list_not_modified(self):
+        parent = Phase.objects.get(title="Parent")
+        url = reverse(
+            "timeline:list", kwargs={"pk": parent.id, "year": 2023, "month": 1}
+        )
+        response = self.client.get(url, headers={"hx-request": "true"})
+        etag = response["ETag"]
+        self.assertIn("HX-Request", response["Vary"])
+        self.assertIn("no-cache", response["Cache-Control"])
+        print("\n-Test phase list validators")
+        response = self.client.get(
+            url, headers={"hx-request": "true", "if-none-match": etag}
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        print("\n-Test phase list not modified")
+        response = self.client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        print("\n-Test phase list page and fragment differ")
+        with self.captureOnCommitCallbacks(execute=True):
+            phase = Phase.objects.get(title="Last")
+            phase.title = "Changed"
+            phase.save()
+        response = self.client.get(
+            url, headers={"hx-request": "true", "if-none-match": etag}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Changed")
+        print("\n-Test phase list modified by save")
+        etag = response["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            Phase.objects.get(title="First").delete()
+        response = self.client.get(
+            url, headers={"hx-request": "true", "if-none-match": etag}
+        )
+        self.assertEqual(response.status_code, 200)
+        print("\n-Test phase list modified by delete")
+
+    def test_project_list_not_modified(self):
+        url = reverse("timeline:project_list", kwargs={"year": 2023, "month": 1})
+        response = self.client.get(url)
+        etag = response["ETag"]
+        with self.assertNumQueries(0):
+            response = self.client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 304)
+        print("\n-Test project list not modified, validated without queries")
+        response = self.client.get(
+            url + "?zoom=quarter", headers={"if-none-match": etag}
+        )
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        print("\n-Test project list modified by zoom in session")
+        etag = response["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            phase = Phase.objects.get(title="Last")
+            phase.duration += 1
+            phase.save()
+        response = self.client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        print("\n-Test project list modified by a descendant")
+
+    def test_schedule_modified(self):
+        # long enough to push last
+        Phase.objects.filter(title="First").update(duration=50)
+        first = Phase.objects.get(title="First")
+        last = Phase.objects.get(title="Last")
+        modified = last.modified
+        Dependency.objects.create(predecessor=first, successor=last)
+        last.refresh_from_db()
+        self.assertGreater(last.modified, modified)
+        print("\n-Test rescheduled phases modified")
+
+    def test_no_validator_without_cache(self):
+        parent = Phase.objects.get(title="Parent")
+        url = reverse(
+            "timeline:list", kwargs={"pk": parent.id, "year": 2023, "month": 1}
+        )
+        dummy = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+        with override_settings(CACHES=dummy):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("ETag"))
+        print("\n-Test list without cache versions has no validator")
+
+    def test_pending_messages(self):
+        parent = Phase.objects.get(title="Parent")
+        url = reverse(
+            "timeline:list", kwargs={"pk": parent.id, "year": 2023, "month": 1}
+        )
+        etag = self.client.get(url)["ETag"]
+        phase = Phase.objects.get(title="Last")
+        self.client.post(
+            reverse("timeline:delete", kwargs={"pk": phase.id}),
+            headers={"hx-request": "true"},
+        )
+        response = self.client.get(url, headers={"if-none-match": etag})
+        self.assertFalse(response.has_header("ETag"))
+        print("\n-Test list with pending messages has no validator")
+
+
+# budgets count the user lookup of the default backend
+@override_settings(
+    AUTHENTICATION_BACKENDS=["django.contrib.auth.backends.ModelBackend"]
+)
+class BenchmarkTest(TestCase):
+    def setUp(self):
+        print("\nTest timeline benchmarks")
+
+    def test_make_portfolio(self):
+        roots = make_portfolio(projects=2, depth=2, fanout=3, fixed=0.5)
+        self.assertEquals(len(roots), 2)
+        self.assertEquals(Phase.objects.count(), 2 * (1 + 3 + 9))
+        phases = Phase.objects.exclude(parent_id=None)
+        self.assertTrue(phases.filter(start__isnull=False).exists())
+        self.assertTrue(phases.filter(start__isnull=True).exists())
+        print("\n-Test synthetic portfolio size and mixed phases")
+
+    def test_query_budgets(self):
+        small = run_benchmarks(projects=2, depth=2, fanout=2)
+        large = run_benchmarks(projects=6, depth=3, fanout=3)
+        self.assertTrue(small["passed"])
+        self.assertTrue(large["passed"])
+        self.assertFalse(Phase.objects.exists())
+        for before, after in zip(small["results"][:2], large["results"][:2]):
+            self.assertEquals(before["queries"], after["queries"])
+        print("\n-Test list views within budget, whatever the portfolio size")
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command("timeline_benchmark", projects=2, depth=2, stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertTrue(report["passed"])
+        self.assertEquals(
+            [result["name"] for result in report["results"]],
+            [
+                "project_list",
+                "phase_list",
+                "descendants_cte",
+                "descendants_path",
+                "ancestors_cte",
+                "ancestors_path",
+                "move_down",
+                "delete",
+                "create_suite",
+            ],
+        )
+        print("\n-Test benchmark command writes a JSON report")
+
+
+class ServerTimingTest(TestCase):
+    def setUp(self):
+        print("\nTest timeline server timing")
+        PhaseStartFactory(title="Parent")
+
+    def test_server_timing_disabled(self):
+        url = reverse("timeline:project_list", kwargs={"year": 2023, "month": 1})
+        with modify_settings(
+            MIDDLEWARE={"append": "timeline.middleware.ServerTimingMiddleware"}
+        ):
+            response = self.client_class().get(url)
+        self.assertFalse(response.has_header("Server-Timing"))
+        print("\n-Test no header unless enabled")
+
+    @override_settings(TIMELINE_SERVER_TIMING=True, TIMELINE_SLOW_REQUEST_MS=0)
+    @modify_settings(
+        MIDDLEWARE={"append": "timeline.middleware.ServerTimingMiddleware"}
+    )
+    def test_server_timing_header(self):
+        url = reverse("timeline:project_list", kwargs={"year": 2023, "month": 1})
+        with self.assertLogs("timeline", "WARNING"):
+            response = self.client_class().get(url, HTTP_HX_REQUEST="true")
+        header = response["Server-Timing"]
+        self.assertIn("db;dur=", header)
+        self.assertIn("render;dur=", header)
+        self.assertIn("total;dur=", header)
+        print("\n-Test header on htmx response and slow request logged")
+
+
+@override_settings(TIMELINE_PAGE_SIZE=2)
+class ProjectListPaginationTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        print("\nTest timeline project list pagination")
+        for i in range(5):
+            PhaseStartFactory(title="Project %(i)s" % {"i": i}, position=i)
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("timeline:project_list", kwargs={"year": 2023, "month": 1})
+
+    def test_first_page(self):
+        response = self.client.get(self.url, HTTP_HX_REQUEST="true")
+        self.assertContains(response, "Project 1")
+        self.assertNotContains(response, "Project 2")
+        last = Phase.objects.get(title="Project 1")
+        self.assertContains(response, "?after=1_%(id)s" % {"id": last.id})
+        print("\n-Test first page ends with a load more row")
+
+    def test_next_page(self):
+        last = Phase.objects.get(title="Project 1")
+        response = self.client.get(
+            self.url, {"after": "1_%(id)s" % {"id": last.id}}, HTTP_HX_REQUEST="true"
+        )
+        self.assertTemplateUsed(response, "timeline/project/htmx/rows.html")
+        self.assertNotContains(response, "Project 1")
+        self.assertContains(response, "Project 3")
+        self.assertContains(response, "?after=")
+        last = Phase.objects.get(title="Project 3")
+        response = self.client.get(
+            self.url, {"after": "3_%(id)s" % {"id": last.id}}, HTTP_HX_REQUEST="true"
+        )
+        self.assertContains(response, "Project 4")
+        self.assertNotContains(response, "?after=")
+        print("\n-Test pages after cursor, no load more row on last page")
+
+    def test_refresh_loaded_pages(self):
+        cursors = [
+            "%(position)s_%(id)s" % {"position": phase.position, "id": phase.id}
+            for phase in Phase.objects.filter(title__in=["Project 1", "Project 3"])
+        ]
+        response = self.client.get(
+            self.url, {"until": cursors + ["bad"]}, HTTP_HX_REQUEST="true"
+        )
+        self.assertContains(response, "Project 0")
+        self.assertContains(response, "Project 3")
+        self.assertNotContains(response, "Project 4")
+        self.assertContains(response, "?after=")
+        print("\n-Test refresh reloads pages up to the last cursor")
+
+
+class ProjectSpanTest(TestCase):
+    def setUp(self):
+        print("\nTest timeline stored project span")
+        parent = PhaseStartFactory(title="Parent", start=date(2020, 1, 6), duration=2)
+        PhaseDelayFactory.create(parent=parent, title="First", duration=3, delay=0)
+        PhaseDelayFactory.create(
+            parent=parent, position=1, title="Last", duration=4, delay=1
+        )
+
+    def assertSpanStored(self):
+        parent = Phase.objects.get(title="Parent")
+        ends = get_project_ends([parent.id])
+        self.assertEquals(parent.span_end, ends[parent.id])
+
+    def test_span_end_updated(self):
+        self.assertSpanStored()
+        self.assertEquals(
+            Phase.objects.get(title="Parent").span_end,
+            date(2020, 1, 6) + timedelta(days=49),
+        )
+        print("\n-Test span end stored on creation")
+        phase = Phase.objects.get(title="Last")
+        phase.duration = 10
+        phase.save()
+        self.assertSpanStored()
+        print("\n-Test span end updated on save")
+        phase.delete()
+        self.assertSpanStored()
+        print("\n-Test span end updated on delete")
+        Phase.objects.get(title="Parent").create_suite()
+        self.assertSpanStored()
+        print("\n-Test span end updated on suite creation")
+
+    def test_span_end_soft_deleted(self):
+        delete_subtree(Phase.objects.get(title="Last"), soft=True)
+        first = Phase.objects.get(title="First")
+        first.save()
+        self.assertSpanStored()
+        end = first.get_start_end()[1]
+        self.assertEquals(Phase.objects.get(title="Parent").span_end, end)
+        Phase.objects.update(span_end=None)
+        parent = Phase.objects.with_project_span().get(title="Parent")
+        self.assertEquals(parent.get_project_start_end()[1], end)
+        print("\n-Test span end ignores soft deleted phases")
+
+    @override_settings(TIMELINE_WINDOW_FILTER=True)
+    def test_window_filter(self):
+        cache.clear()
+        PhaseStartFactory(title="Current", position=1, start=date(2023, 2, 6))
+        url = reverse("timeline:project_list", kwargs={"year": 2023, "month": 1})
+        response = self.client.get(url)
+        self.assertContains(response, "Current")
+        self.assertNotContains(response, "Parent")
+        self.assertEquals(response.context["hidden_count"], 1)
+        url = reverse("timeline:project_list", kwargs={"year": 2020, "month": 1})
+        response = self.client.get(url)
+        self.assertContains(response, "Parent")
+        self.assertEquals(response.context["hidden_count"], 1)
+        print("\n-Test projects outside the chart window hidden and counted")
+        PhaseStartFactory(title="Undated", position=2, start=None)
+        response = self.client.get(url)
+        self.assertNotContains(response, "Undated")
+        self.assertEquals(response.context["hidden_count"], 2)
+        print("\n-Test projects without dates hidden by the window")
+
+
+class PhaseSwapRowsTest(TestCase):
+    def setUp(self):
+        print("\nTest timeline out of band row swaps")
+        parent = PhaseStartFactory(title="Parent")
+        first = PhaseDelayFactory.create(parent=parent, title="First")
+        PhaseDelayFactory.create(parent=first, title="Child")
+        PhaseDelayFactory.create(parent=parent, position=1, title="Last")
+        self.headers = {
+            "hx-request": "true",
+            "hx-current-url": "http://testserver"
+            + reverse(
+                "timeline:list", kwargs={"pk": parent.id, "year": 2023, "month": 1}
+            ),
+        }
+
+    def test_get_swap_ranges(self):
+        old = [(1, None), (2, 1), (3, 2), (4, 1)]
+        new = [(1, None), (4, 1), (2, 1), (3, 2)]
+        self.assertEquals(get_swap_ranges(old, new), ([2, 3, 4], [4, 2, 3], None))
+        print("\n-Test moved pair swapped")
+        new = [(1, None), (4, 1)]
+        self.assertEquals(get_swap_ranges(old, new), ([2, 3, 4], [4], None))
+        print("\n-Test renumbered siblings swapped after delete")
+        self.assertEquals(get_swap_ranges(old, old, {3}), ([3], [3], 4))
+        print("\n-Test changed rows swapped in place")
+
+    def test_move_down_swaps_rows(self):
+        first = Phase.objects.get(title="First")
+        last = Phase.objects.get(title="Last")
+        response = self.client.post(
+            reverse("timeline:move_down", kwargs={"pk": first.id}),
+            headers=self.headers,
+        )
+        self.assertTemplateUsed(response, "timeline/htmx/swap_rows.html")
+        self.assertEqual(response["HX-Reswap"], "none")
+        self.assertFalse(response.has_header("HX-Trigger-After-Swap"))
+        self.assertContains(
+            response,
+            '<tr id="phase-row-%(id)s" hx-swap-oob="delete">' % {"id": first.id},
+        )
+        self.assertContains(response, 'id="phase-row-%(id)s"' % {"id": last.id}, 2)
+        print("\n-Test move down swaps the moved pair")
+
+    def test_update_swaps_subtree(self):
+        first = Phase.objects.get(title="First")
+        response = self.client.post(
+            reverse("timeline:update", kwargs={"pk": first.id}),
+            {
+                "title": "Renamed",
+                "parent": first.parent_id,
+                "phase_type": "#dddddd",
+                "start": "",
+                "duration": 2,
+                "delay": 0,
+            },
+            headers=self.headers,
+        )
+        self.assertTemplateUsed(response, "timeline/htmx/swap_rows.html")
+        self.assertContains(response, "Renamed")
+        self.assertContains(response, "Child")
+        self.assertNotContains(response, "Last")
+        print("\n-Test update swaps the rescheduled subtree")
+
+    def test_dependency_swaps_rescheduled_rows(self):
+        first = Phase.objects.get(title="First")
+        last = Phase.objects.get(title="Last")
+        Dependency.objects.create(predecessor=last, successor=first)
+        response = self.client.post(
+            reverse("timeline:update", kwargs={"pk": last.id}),
+            {
+                "title": "Last",
+                "parent": last.parent_id,
+                "phase_type": "#dddddd",
+                "start": "",
+                "duration": last.duration + 10,
+                "delay": last.delay,
+            },
+            headers=self.headers,
+        )
+        self.assertTemplateUsed(response, "timeline/htmx/swap_rows.html")
+        self.assertContains(response, 'id="phase-row-%(id)s"' % {"id": first.id})
+        self.assertContains(response, "Child")
+        print("\n-Test successors rescheduled by an update swapped")
+        response = self.client.post(
+            reverse("timeline:delete", kwargs={"pk": last.id}), headers=self.headers
+        )
+        self.assertContains(response, 'id="phase-row-%(id)s"' % {"id": first.id})
+        print("\n-Test successors freed by a delete swapped")
+
+    def test_create_without_parent(self):
+        parent = Phase.objects.get(title="Parent")
+        response = self.client.post(
+            reverse("timeline:create", kwargs={"pk": parent.id}),
+            {
+                "title": "Orphan",
+                "parent": "",
+                "phase_type": "#dddddd",
+                "start": "",
+                "duration": 2,
+                "delay": 0,
+            },
+            headers=self.headers,
+        )
+        self.assertRedirects(
+            response, reverse("timeline:refresh_list"), fetch_redirect_response=False
+        )
+        self.assertIsNone(Phase.objects.get(title="Orphan").parent_id)
+        print("\n-Test create without parent refreshes the list")
+
+    def test_refresh_fallback(self):
+        first = Phase.objects.get(title="First")
+        headers = {"hx-request": "true"}
+        response = self.client.post(
+            reverse("timeline:move_down", kwargs={"pk": first.id}), headers=headers
+        )
+        self.assertTemplateUsed(response, "timeline/htmx/move.html")
+        self.assertEqual(response["HX-Trigger-After-Swap"], "refreshList")
+        print("\n-Test refresh list triggered out of the phase list")
+
 
 class PhaseViewTest(TestCase):
     @classmethod
@@ -187,7 +1254,7 @@ class PhaseViewTest(TestCase):
         self.assertTemplateUsed(response, "timeline/list.html")
         print("\n-Test list template")
         self.assertEquals(response.context["year"], 2023)
-        self.assertIsInstance(response.context["month_dict"], dict)
+        self.assertEquals(len(response.context["chart_columns"]), 12)
         self.assertEquals(response.context["object_list"].first().tree_depth, 0)
         print("\n-Test list context")
         response = self.client.get(
@@ -199,6 +1266,31 @@ class PhaseViewTest(TestCase):
         self.assertTemplateUsed(response, "timeline/htmx/list.html")
         print("\n-Test list template with HTMX header")
 
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+    )
+    def test_list_views_queries(self):
+        parent = Phase.objects.get(title="Parent")
+        urls = [
+            reverse(
+                "timeline:list", kwargs={"pk": parent.id, "year": 2023, "month": 1}
+            ),
+            reverse("timeline:project_list", kwargs={"year": 2023, "month": 1}),
+        ]
+        counts = []
+        for url in urls:
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.get(url)
+            counts.append(len(ctx))
+        first = Phase.objects.get(title="First")
+        for i in range(5):
+            PhaseDelayFactory.create(parent=first, position=i)
+            PhaseStartFactory.create(position=i + 1)
+        for url, count in zip(urls, counts):
+            with self.assertNumQueries(count):
+                self.client.get(url)
+        print("\n-Test list views queries do not grow with rows")
+
     def test_create_view(self):
         parent = Phase.objects.get(title="Parent")
         response = self.client.get(
@@ -271,10 +1363,16 @@ class PhaseViewModifyTest(TestCase):
             target_status_code=200,
         )
         print("\n-Test update redirect")
+        ph1 = Phase.objects.get(title="Bar")
+        self.assertEqual(ph1.parent, None)
+        self.assertEqual(ph1.position, 1)
+        ph2 = Phase.objects.get(title="Last")
+        self.assertEqual(ph2.position, 0)
+        print("\n-Test update reparent positions")
 
     def test_move_down_view(self):
         ph1 = Phase.objects.get(title="First")
-        response = self.client.get(
+        response = self.client.post(
             reverse("timeline:move_down", kwargs={"pk": ph1.id}),
             headers={"hx-request": "true"},
         )
@@ -286,9 +1384,21 @@ class PhaseViewModifyTest(TestCase):
         self.assertEqual(ph2.position, 0)
         print("\n-Test move down next position")
 
+    def test_move_get_not_allowed(self):
+        ph1 = Phase.objects.get(title="First")
+        response = self.client.get(
+            reverse("timeline:move_down", kwargs={"pk": ph1.id}),
+            headers={"hx-request": "true"},
+        )
+        self.assertEqual(response.status_code, 405)
+        print("\n-Test move down get status 405")
+        ph1.refresh_from_db()
+        self.assertEqual(ph1.position, 0)
+        print("\n-Test move down get keeps position")
+
     def test_move_up_view(self):
         ph2 = Phase.objects.get(title="Last")
-        response = self.client.get(
+        response = self.client.post(
             reverse("timeline:move_up", kwargs={"pk": ph2.id}),
             headers={"hx-request": "true"},
         )
@@ -306,6 +1416,14 @@ class PhaseViewModifyTest(TestCase):
             reverse("timeline:delete", kwargs={"pk": ph1.id}),
             headers={"hx-request": "true"},
         )
+        self.assertTemplateUsed(response, "timeline/htmx/delete_confirm.html")
+        self.assertFalse(response.has_header("HX-Trigger-After-Swap"))
+        self.assertTrue(Phase.objects.filter(id=ph1.id).exists())
+        print("\n-Test delete confirms on GET")
+        response = self.client.post(
+            reverse("timeline:delete", kwargs={"pk": ph1.id}),
+            headers={"hx-request": "true"},
+        )
         self.assertEqual(response.status_code, 200)
         print("\n-Test delete status 200")
         self.assertTemplateUsed(response, "timeline/htmx/delete.html")
@@ -313,3 +1431,520 @@ class PhaseViewModifyTest(TestCase):
         ph2 = Phase.objects.get(title="Last")
         self.assertEqual(ph2.position, 0)
         print("\n-Test delete next position")
+
+    def test_reorder_view(self):
+        ph2 = Phase.objects.get(title="Last")
+        response = self.client.post(
+            reverse("timeline:reorder", kwargs={"pk": ph2.id}),
+            {"index": 0},
+            headers={"hx-request": "true"},
+        )
+        self.assertEqual(response.status_code, 200)
+        print("\n-Test reorder status 200")
+        ph1 = Phase.objects.get(title="First")
+        self.assertEqual(ph1.position, 1)
+        print("\n-Test reorder sibling position")
+        response = self.client.post(
+            reverse("timeline:reorder", kwargs={"pk": ph2.id}),
+            {"index": "foo"},
+            headers={"hx-request": "true"},
+        )
+        self.assertEqual(response.status_code, 400)
+        print("\n-Test reorder bad index")
+
+
+class PhaseParentChoiceTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        print("\nTest timeline parent choices")
+        parent = PhaseStartFactory(title="Parent")
+        PhaseDelayFactory.create(parent=parent, title="First")
+        other = PhaseStartFactory(title="Other", position=1)
+        PhaseDelayFactory.create(parent=other, title="Elsewhere")
+
+    def test_parent_choices(self):
+        parent = Phase.objects.get(title="Parent")
+        form = PhaseCreateForm(project=parent)
+        labels = [label for value, label in form.fields["parent"].choices]
+        self.assertEquals(labels, ["---------", "Parent", "--- First"])
+        print("\n-Test parent choices of the project")
+        elsewhere = Phase.objects.get(title="Elsewhere")
+        form = PhaseCreateForm(
+            {
+                "title": "Foo",
+                "parent": elsewhere.id,
+                "phase_type": "#dddddd",
+                "duration": 1,
+                "delay": 0,
+            },
+            project=parent,
+        )
+        labels = [label for value, label in form.fields["parent"].choices]
+        self.assertEquals(labels[-1], "Elsewhere")
+        self.assertTrue(form.is_valid())
+        self.assertEquals(form.cleaned_data["parent"], elsewhere)
+        print("\n-Test parent of another project accepted")
+        form = PhaseCreateForm({"title": "Foo", "parent": 0}, project=parent)
+        self.assertIn("parent", form.errors)
+        print("\n-Test missing parent rejected")
+
+    def test_create_view_choices(self):
+        parent = Phase.objects.get(title="Parent")
+        response = self.client.get(
+            reverse("timeline:create", kwargs={"pk": parent.id}),
+            headers={"hx-request": "true"},
+        )
+        self.assertContains(response, "--- First")
+        self.assertNotContains(response, "Elsewhere")
+        self.assertContains(response, reverse("timeline:parent_search"))
+        print("\n-Test create form offers phases of the project")
+        url = reverse("timeline:create", kwargs={"pk": parent.id})
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(url, headers={"hx-request": "true"})
+        for i in range(5):
+            other = PhaseStartFactory.create(position=i + 2)
+            PhaseDelayFactory.create(parent=other)
+        with self.assertNumQueries(len(ctx)):
+            response = self.client.get(url, headers={"hx-request": "true"})
+        # parent choices, and types
+        self.assertContains(response, "<option", 3 + len(Phase.TYPES))
+        print("\n-Test create form does not grow with the portfolio")
+
+    def test_parent_search(self):
+        parent = Phase.objects.get(title="Parent")
+        url = reverse("timeline:parent_search")
+        response = self.client.get(
+            url,
+            {"search": "else", "project": parent.id},
+            headers={"hx-request": "true"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEquals(
+            [label for value, label in response.context["choices"]],
+            ["Elsewhere (Other)"],
+        )
+        print("\n-Test parent search in all projects")
+        response = self.client.get(
+            url, {"search": "", "project": parent.id}, headers={"hx-request": "true"}
+        )
+        self.assertEquals(
+            [label for value, label in response.context["choices"]],
+            ["Parent", "--- First"],
+        )
+        print("\n-Test empty parent search lists the project")
+        with override_settings(TIMELINE_SEARCH_LIMIT=1):
+            response = self.client.get(
+                url, {"search": "e"}, headers={"hx-request": "true"}
+            )
+        self.assertEquals(len(response.context["choices"]), 1)
+        print("\n-Test parent search limit")
+
+    def test_parent_search_project(self):
+        url = reverse("timeline:parent_search")
+        for params in ({}, {"project": ""}, {"project": "abc"}):
+            response = self.client.get(url, params, headers={"hx-request": "true"})
+            self.assertEqual(response.status_code, 400)
+        print("\n-Test parent search without a valid project")
+        response = self.client.get(
+            url, {"project": 999999}, headers={"hx-request": "true"}
+        )
+        self.assertEqual(response.status_code, 404)
+        print("\n-Test parent search of a missing project")
+
+
+class PhaseAsyncViewTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # urls pick views when loaded, then get included
+        root_urls = import_module(settings.ROOT_URLCONF)
+        with override_settings(TIMELINE_ASYNC_VIEWS=True):
+            reload(timeline_urls)
+            reload(root_urls)
+        clear_url_caches()
+        cls.addClassCleanup(clear_url_caches)
+        cls.addClassCleanup(reload, root_urls)
+        cls.addClassCleanup(reload, timeline_urls)
+
+    def setUp(self):
+        print("\nTest async timeline views")
+        parent = PhaseStartFactory(title="Parent")
+        PhaseDelayFactory.create(parent=parent, title="First")
+        PhaseDelayFactory.create(parent=parent, position=1, title="Last")
+
+    async def test_list_views(self):
+        parent = await Phase.objects.aget(title="Parent")
+        url = reverse(
+            "timeline:list", kwargs={"pk": parent.id, "year": 2023, "month": 1}
+        )
+        self.assertIs(resolve(url).func.view_class, AsyncPhaseListView)
+        response = await self.async_client.get(url, headers={"hx-request": "true"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "timeline/htmx/list.html")
+        self.assertEquals(response.context["object_list"][0].tree_depth, 0)
+        self.assertEquals(len(response.context["object_list"]), 3)
+        print("\n-Test async list")
+        response = await self.async_client.get(
+            url, headers={"hx-request": "true", "if-none-match": response["ETag"]}
+        )
+        self.assertEqual(response.status_code, 304)
+        print("\n-Test async list not modified")
+        response = await self.async_client.get(
+            reverse("timeline:project_list", kwargs={"year": 2023, "month": 1})
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEquals(response.context["object_list"], [parent])
+        self.assertEquals(response.context["has_more"], False)
+        print("\n-Test async project list")
+        response = await self.async_client.get(
+            reverse("timeline:list", kwargs={"pk": 0, "year": 2023, "month": 1})
+        )
+        self.assertEqual(response.status_code, 404)
+        print("\n-Test async list of missing project")
+
+    async def test_change_views(self):
+        ph1 = await Phase.objects.aget(title="First")
+        response = await self.async_client.post(
+            reverse("timeline:move_down", kwargs={"pk": ph1.id}),
+            headers={"hx-request": "true"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "timeline/htmx/move.html")
+        ph2 = await Phase.objects.aget(title="Last")
+        self.assertEqual(ph2.position, 0)
+        print("\n-Test async move down")
+        response = await self.async_client.post(
+            reverse("timeline:move_up", kwargs={"pk": ph1.id}),
+            headers={"hx-request": "true"},
+        )
+        self.assertEqual(response.status_code, 200)
+        ph2 = await Phase.objects.aget(title="Last")
+        self.assertEqual(ph2.position, 1)
+        print("\n-Test async move up")
+        response = await self.async_client.get(
+            reverse("timeline:delete", kwargs={"pk": ph1.id}),
+            headers={"hx-request": "true"},
+        )
+        self.assertTemplateUsed(response, "timeline/htmx/delete_confirm.html")
+        print("\n-Test async delete confirmation")
+        response = await self.async_client.post(
+            reverse("timeline:delete", kwargs={"pk": ph1.id}),
+            headers={"hx-request": "true"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "timeline/htmx/delete.html")
+        ph2 = await Phase.objects.aget(title="Last")
+        self.assertEqual(ph2.position, 0)
+        print("\n-Test async delete")
+
+    async def test_create_view(self):
+        parent = await Phase.objects.aget(title="Parent")
+        url = reverse("timeline:create", kwargs={"pk": parent.id})
+        response = await self.async_client.get(url, headers={"hx-request": "true"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEquals(response.context["form"].initial["parent"], parent)
+        print("\n-Test async create form")
+        response = await self.async_client.post(
+            url,
+            {
+                "title": "Foo",
+                "parent": parent.id,
+                "phase_type": "#dddddd",
+                "start": "",
+                "duration": 2,
+                "delay": 0,
+            },
+            headers={"hx-request": "true"},
+        )
+        self.assertEqual(response.status_code, 302)
+        phase = await Phase.objects.aget(title="Foo")
+        self.assertEqual(phase.position, 2)
+        print("\n-Test async create position")
+
+
+class PhaseExportTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        print("\nTest timeline export")
+        parent = Phase.objects.create(title="Parent", start=date(2024, 1, 1))
+        first = Phase.objects.create(parent=parent, title="First", duration=2)
+        Phase.objects.create(parent=first, title="Child", duration=3)
+        Phase.objects.create(parent=parent, position=1, title="Last", duration=4)
+        Phase.objects.create(title="Other", position=1, start=date(2025, 1, 1))
+
+    def test_export_csv(self):
+        response = self.client.get(reverse("timeline:export"))
+        self.assertEquals(response["Content-Type"], "text/csv")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEquals(lines[0], ",".join(EXPORT_FIELDS))
+        self.assertEquals(
+            [line.split(",")[3] for line in lines[1:]],
+            ["0", "0.0", "0.0.0", "0.1", "1"],
+        )
+        print("\n-Test csv export in tree order with punctuated index")
+
+    def test_export_jsonl(self):
+        parent = Phase.objects.get(title="Parent")
+        response = self.client.get(
+            reverse("timeline:export"),
+            {"format": "jsonl", "project": parent.id, "start": "2024-01-23"},
+        )
+        rows = [json.loads(line) for line in response.streaming_content]
+        self.assertEquals([row["title"] for row in rows], ["Child", "Last"])
+        self.assertEquals(rows[0]["index"], "0.0.0")
+        self.assertEquals(rows[0]["start"], "2024-01-22")
+        print("\n-Test jsonl export filtered by project and window")
+        response = self.client.get(
+            reverse("timeline:export"), {"start": "2024-02-01", "end": "2024-01-01"}
+        )
+        self.assertEquals(response.status_code, 400)
+        print("\n-Test export rejects inverted window")
+
+
+MSP_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<Project xmlns="http://schemas.microsoft.com/project">
+  <Tasks>
+    <Task><UID>0</UID><Name>Tower</Name><OutlineLevel>0</OutlineLevel>
+      <OutlineNumber>0</OutlineNumber><Start>2024-01-01T08:00:00</Start>
+      <Duration>PT160H0M0S</Duration></Task>
+    <Task><UID>1</UID><Name>Design</Name><OutlineLevel>1</OutlineLevel>
+      <OutlineNumber>1</OutlineNumber><Start>2024-01-01T08:00:00</Start>
+      <Duration>PT80H0M0S</Duration></Task>
+    <Task><UID>2</UID><Name>Sketch</Name><OutlineLevel>2</OutlineLevel>
+      <OutlineNumber>1.1</OutlineNumber><Start>2024-01-08T08:00:00</Start>
+      <Duration>PT20H0M0S</Duration></Task>
+  </Tasks>
+</Project>
+"""
+
+
+class PhaseImportTest(TestCase):
+    def test_read_tree(self):
+        text = "index,title,type,start,duration,delay\n"
+        text += "0,Project,,2024-01-01,2,0\n0.1,Second,,,3,1\n0.0,First,,,1,0\n"
+        nodes = read_tree(text, "csv")
+        self.assertEquals(nodes[0]["start"], date(2024, 1, 1))
+        titles = [node["title"] for node in nodes[0]["children"]]
+        self.assertEquals(titles, ["First", "Second"])
+        print("\n-Test csv rows nested by punctuated index")
+        text = "index,title,duration\n0,,1\n0.0,Child,-1\n1.0,Orphan,1\n"
+        with self.assertRaises(ValidationError) as context:
+            read_tree(text, "csv")
+        self.assertEquals(
+            context.exception.messages,
+            [
+                "Row 2: Every phase needs a title",
+                "Row 3: Duration must be a positive integer",
+                "Row 4: no parent with index 1",
+            ],
+        )
+        print("\n-Test errors of every row reported at once")
+
+    def test_import_tree(self):
+        nodes = read_tree(
+            json.dumps(
+                [
+                    {
+                        "title": "Project",
+                        "start": "2024-01-01",
+                        "children": [
+                            {"title": "First", "duration": 2},
+                            {"title": "Second", "children": [{"title": "Child"}]},
+                        ],
+                    },
+                    {"title": "Other", "start": "2024-03-01"},
+                ]
+            ),
+            "json",
+        )
+        with self.assertNumQueries(9):
+            created = import_tree(nodes)
+        self.assertEquals(len(created), 5)
+        project = Phase.objects.get(title="Project")
+        labels = [
+            p.get_punctuated_index()
+            for p in project.descendants(include_self=True).with_tree_labels()
+        ]
+        self.assertEquals(labels, ["0", "0.0", "0.1", "0.1.0"])
+        child = Phase.objects.get(title="Child")
+        self.assertEquals(child.computed_start, date(2024, 1, 15))
+        self.assertEquals(project.span_end, date(2024, 1, 22))
+        print("\n-Test json tree imported one level at a time")
+        nodes = read_tree('{"index": "0", "title": "Appended"}', "jsonl")
+        import_tree(nodes, project)
+        appended = Phase.objects.get(title="Appended")
+        self.assertEquals(appended.parent, project)
+        self.assertEquals(appended.get_punctuated_index(), "0.2")
+        print("\n-Test jsonl rows appended to project")
+
+    def test_read_xml(self):
+        nodes = read_tree(MSP_XML, "xml")
+        self.assertEquals(nodes[0]["title"], "Tower")
+        design = nodes[0]["children"][0]
+        self.assertEquals((design["start"], design["duration"]), (date(2024, 1, 1), 2))
+        self.assertEquals(design["children"][0]["duration"], 1)
+        print("\n-Test MS Project tasks below the project summary")
+
+    def test_import_command(self):
+        path = "/tmp/timeline_import_test.xml"
+        with open(path, "w") as f:
+            f.write(MSP_XML)
+        out = StringIO()
+        call_command("timeline_import", path, stdout=out)
+        self.assertEquals(out.getvalue().strip(), "Imported 3 phases")
+        print("\n-Test import command")
+
+    def test_import_view(self):
+        url = reverse("timeline:project_import")
+        upload = SimpleUploadedFile("tower.csv", b"index,title\n0,Tower\n0.0,\n")
+        response = self.client.post(url, {"file": upload}, HTTP_HX_REQUEST="true")
+        self.assertContains(response, "Row 3: Every phase needs a title")
+        self.assertFalse(Phase.objects.exists())
+        print("\n-Test import view reports errors without writes")
+        upload = SimpleUploadedFile("tower.csv", b"index,title\n0,Tower\n0.0,Design\n")
+        response = self.client.post(url, {"file": upload}, HTTP_HX_REQUEST="true")
+        self.assertRedirects(
+            response, reverse("timeline:refresh_list"), fetch_redirect_response=False
+        )
+        self.assertEquals(Phase.objects.count(), 2)
+        print("\n-Test import view")
+
+
+class ChartSvgTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        print("\nTest timeline svg charts")
+        parent = Phase.objects.create(title="Parent", start=date(2024, 1, 1))
+        Phase.objects.create(parent=parent, title="First", duration=2)
+        Phase.objects.create(parent=parent, position=1, title="Last", duration=4)
+        Phase.objects.create(title="Other", position=1, start=date(2024, 3, 4))
+
+    def setUp(self):
+        cache.clear()
+        self.parent = Phase.objects.get(title="Parent")
+
+    def test_phase_svg(self):
+        url = reverse(
+            "timeline:svg", kwargs={"pk": self.parent.id, "year": 2024, "month": 1}
+        )
+        response = self.client.get(url)
+        self.assertEquals(response["Content-Type"], "image/svg+xml")
+        self.assertContains(response, "<rect", 3)
+        self.assertContains(response, "<line", 12)
+        self.assertContains(response, "0.1 Last")
+        self.assertContains(response, 'x="2.19%" y="44" width="3.83%"')
+        print("\n-Test phases in one svg with month gridlines")
+        with self.assertNumQueries(1):
+            self.client.get(url)
+        print("\n-Test phase svg cached by project version")
+
+    def test_project_svg(self):
+        url = reverse("timeline:project_svg", kwargs={"year": 2024, "month": 1})
+        response = self.client.get(url)
+        self.assertContains(response, "<rect", 2)
+        self.assertContains(response, "Type: Project, start: 2024-03-04")
+        print("\n-Test portfolio in one svg")
+
+    def test_chart_mode(self):
+        url = reverse(
+            "timeline:list", kwargs={"pk": self.parent.id, "year": 2024, "month": 1}
+        )
+        response = self.client.get(url, {"mode": "svg"}, HTTP_HX_REQUEST="true")
+        self.assertContains(response, '<svg xmlns="http://www.w3.org/2000/svg"')
+        self.assertNotContains(response, "phase-row-")
+        response = self.client.get(url, HTTP_HX_REQUEST="true")
+        self.assertContains(response, '<svg xmlns="http://www.w3.org/2000/svg"')
+        print("\n-Test svg mode kept in session")
+        first = Phase.objects.get(title="First")
+        response = self.client.post(
+            reverse("timeline:move_down", kwargs={"pk": first.id}),
+            headers={"hx-request": "true", "hx-current-url": "http://testserver" + url},
+        )
+        self.assertEquals(response["HX-Trigger-After-Swap"], "refreshList")
+        print("\n-Test svg mode refreshes the list instead of swapping rows")
+        response = self.client.get(url, {"mode": "table"}, HTTP_HX_REQUEST="true")
+        self.assertContains(response, "phase-row-")
+        print("\n-Test table mode")
+
+
+class ChartZoomTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        print("\nTest timeline chart zoom")
+        parent = Phase.objects.create(
+            title="Parent", start=date(2024, 1, 1), duration=30
+        )
+        long = Phase.objects.create(parent=parent, title="Long", duration=20)
+        Phase.objects.create(parent=long, title="Short", duration=1, delay=2)
+        Phase.objects.create(parent=parent, position=1, title="Brief", duration=1)
+
+    def setUp(self):
+        cache.clear()
+        self.parent = Phase.objects.get(title="Parent")
+
+    def test_chart_window(self):
+        self.assertEquals(
+            get_chart_start_end(2024, 5, "quarter"),
+            (date(2024, 4, 1), date(2024, 6, 30)),
+        )
+        self.assertEquals(
+            get_chart_start_end(2024, 5, "decade"),
+            (date(2020, 1, 1), date(2029, 12, 31)),
+        )
+        self.assertEquals(get_chart_pages(2024, 5, "quarter"), ((2024, 1), (2024, 7)))
+        self.assertEquals(get_chart_pages(2024, 5, "decade"), ((2015, 1), (2025, 1)))
+        self.assertEquals(get_chart_title(2024, 1, "quarter"), "Q1 2024")
+        self.assertEquals(get_chart_title(2024, 8, "year"), "2024 / 2025")
+        self.assertEquals(get_chart_title(2024, 5, "three_years"), "2024 - 2026")
+        print("\n-Test chart windows by zoom")
+        columns = get_chart_columns(2024, 1, "quarter")
+        self.assertEquals(columns[0]["label"], "W1")
+        self.assertEquals(len(columns), 13)
+        columns = get_chart_columns(2024, 1, "three_years")
+        self.assertEquals(columns[0]["label"], "Q1 24")
+        self.assertEquals(len(columns), 12)
+        columns = get_chart_columns(2024, 1, "decade")
+        self.assertEquals([c["label"] for c in columns][:2], ["2020", "2021"])
+        self.assertEquals(columns[1]["margin"], "10.0192")
+        print("\n-Test chart columns by zoom")
+
+    def test_folding(self):
+        phases = list(
+            self.parent.descendants(include_self=True)
+            .with_schedule()
+            .with_folding("year")
+        )
+        self.assertFalse(any(getattr(phase, "folded", False) for phase in phases))
+        print("\n-Test nothing folded at year zoom")
+        phases = {
+            phase.title: phase
+            for phase in self.parent.descendants(include_self=True)
+            .with_schedule()
+            .with_folding("three_years")
+        }
+        self.assertFalse(phases["Parent"].folded)
+        self.assertFalse(phases["Long"].folded)
+        self.assertTrue(phases["Short"].folded)
+        self.assertTrue(phases["Brief"].folded)
+        self.assertEquals(phases["Long"].folded_count, 1)
+        self.assertEquals(
+            phases["Long"].get_start_end(), (date(2024, 7, 29), date(2025, 1, 6))
+        )
+        self.assertIn("summarizing 1 short phases", phases["Long"].get_popup())
+        print("\n-Test short phases folded into summary bars")
+
+    def test_chart_zoom(self):
+        url = reverse(
+            "timeline:list", kwargs={"pk": self.parent.id, "year": 2024, "month": 1}
+        )
+        response = self.client.get(url, {"zoom": "three_years"}, HTTP_HX_REQUEST="true")
+        self.assertEquals(response.context["zoom"], "three_years")
+        self.assertContains(response, "phase-row-", 2)
+        self.assertNotContains(response, "0.1 Brief")
+        response = self.client.get(url, HTTP_HX_REQUEST="true")
+        self.assertEquals(response.context["chart_title"], "2024 - 2026")
+        print("\n-Test zoom kept in session, folded rows hidden")
+        response = self.client.get(url, {"zoom": "quarter"}, HTTP_HX_REQUEST="true")
+        self.assertEquals(len(response.context["chart_columns"]), 13)
+        self.assertEquals(response.context["next"], (2024, 4))
+        print("\n-Test quarter zoom")
@@ -1,7 +1,14 @@
+from django.conf import settings
 from django.urls import path
 from django.utils.translation import gettext_lazy as _
 
+from .views.export import PhaseExportView
 from .views.phase import (
+    AsyncPhaseCreateView,
+    AsyncPhaseDeleteView,
+    AsyncPhaseListView,
+    AsyncPhaseMoveDownView,
+    AsyncPhaseMoveUpView,
     PhaseAddButtonView,
     PhaseCreateView,
     PhaseDeleteView,
@@ -9,16 +16,31 @@ from .views.phase import (
     PhaseListView,
     PhaseMoveDownView,
     PhaseMoveUpView,
+    PhaseParentSearchView,
+    PhaseReorderView,
+    PhaseRestoreView,
+    PhaseSvgView,
     PhaseUpdateView,
     RefreshListView,
 )
 from .views.project import (
+    AsyncProjectListView,
     BaseRedirectView,
     ProjectAddButtonView,
     ProjectCreateView,
+    ProjectImportView,
     ProjectListView,
+    ProjectSvgView,
 )
 
+
+def get_view(view, async_view):
+    """Async variant of view if TIMELINE_ASYNC_VIEWS, for ASGI deployments"""
+    if getattr(settings, "TIMELINE_ASYNC_VIEWS", False):
+        return async_view.as_view()
+    return view.as_view()
+
+
 app_name = "timeline"
 urlpatterns = [
     # Generic urlpatterns
@@ -27,6 +49,11 @@ urlpatterns = [
         RefreshListView.as_view(),
         name="refresh_list",
     ),
+    path(
+        "export/",
+        PhaseExportView.as_view(),
+        name="export",
+    ),
     # Project urlpatterns
     path(
         "",
@@ -35,14 +62,24 @@ urlpatterns = [
     ),
     path(
         _("project/list/year/<int:year>/<int:month>/"),
-        ProjectListView.as_view(),
+        get_view(ProjectListView, AsyncProjectListView),
         name="project_list",
     ),
+    path(
+        _("project/list/year/<int:year>/<int:month>/svg/"),
+        ProjectSvgView.as_view(),
+        name="project_svg",
+    ),
     path(
         "project/create/",
         ProjectCreateView.as_view(),
         name="project_create",
     ),
+    path(
+        "project/import/",
+        ProjectImportView.as_view(),
+        name="project_import",
+    ),
     path(
         "project/add/button/",
         ProjectAddButtonView.as_view(),
@@ -51,12 +88,17 @@ urlpatterns = [
     # Phase urlpatterns
     path(
         _("project/<pk>/year/<int:year>/<int:month>/"),
-        PhaseListView.as_view(),
+        get_view(PhaseListView, AsyncPhaseListView),
         name="list",
     ),
+    path(
+        _("project/<pk>/year/<int:year>/<int:month>/svg/"),
+        PhaseSvgView.as_view(),
+        name="svg",
+    ),
     path(
         "project/<pk>/phase/create/",
-        PhaseCreateView.as_view(),
+        get_view(PhaseCreateView, AsyncPhaseCreateView),
         name="create",
     ),
     path(
@@ -64,6 +106,11 @@ urlpatterns = [
         PhaseAddButtonView.as_view(),
         name="add_button",
     ),
+    path(
+        "phase/parent/search/",
+        PhaseParentSearchView.as_view(),
+        name="parent_search",
+    ),
     path(
         "phase/<pk>/",
         PhaseDetailView.as_view(),
@@ -76,17 +123,27 @@ urlpatterns = [
     ),
     path(
         "phase/<pk>/delete/",
-        PhaseDeleteView.as_view(),
+        get_view(PhaseDeleteView, AsyncPhaseDeleteView),
         name="delete",
     ),
+    path(
+        "phase/<pk>/restore/",
+        PhaseRestoreView.as_view(),
+        name="restore",
+    ),
     path(
         "phase/<pk>/move/down/",
-        PhaseMoveDownView.as_view(),
+        get_view(PhaseMoveDownView, AsyncPhaseMoveDownView),
         name="move_down",
     ),
     path(
         "phase/<pk>/move/up/",
-        PhaseMoveUpView.as_view(),
+        get_view(PhaseMoveUpView, AsyncPhaseMoveUpView),
         name="move_up",
     ),
+    path(
+        "phase/<pk>/reorder/",
+        PhaseReorderView.as_view(),
+        name="reorder",
+    ),
 ]
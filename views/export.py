@@ -0,0 +1,124 @@
+import csv
+import json
+from datetime import date
+
+from django.conf import settings
+from django.contrib.auth.mixins import PermissionRequiredMixin
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+from django.views import View
+from timeline.forms import PhaseExportForm
+from timeline.models import Phase, get_position_gap, get_tree_index
+
+EXPORT_FIELDS = [
+    "project",
+    "id",
+    "parent",
+    "index",
+    "title",
+    "type",
+    "start",
+    "end",
+    "duration",
+    "delay",
+]
+
+
+def get_export_chunk_size():
+    return getattr(settings, "TIMELINE_EXPORT_CHUNK_SIZE", 2000)
+
+
+class Echo:
+    """File-like object handing back what the csv writer writes"""
+
+    def write(self, value):
+        return value
+
+
+def overlaps(phase, start, end):
+    if start and (not phase.computed_end or phase.computed_end < start):
+        return False
+    if end and (not phase.computed_start or phase.computed_start > end):
+        return False
+    return True
+
+
+def iter_export_rows(projects, start=None, end=None):
+    """Yields phases of projects in tree order, with computed dates.
+
+    Phases are read in chunks, one project at a time, and punctuated indexes
+    are built from the labels of the ancestors of the current phase only.
+    """
+    dense = get_position_gap() == 1
+    chunk_size = get_export_chunk_size()
+    for project in projects.iterator(chunk_size=chunk_size):
+        phases = project.descendants(include_self=True)
+        if not dense:
+            phases = phases.with_sibling_index()
+        if get_tree_index():
+            # phases are sorted in tree order once fetched, a project at a time
+            phases = iter(phases)
+        else:
+            phases = phases.iterator(chunk_size=chunk_size)
+        labels = []
+        for phase in phases:
+            del labels[phase.tree_depth :]
+            labels.append(str(phase.get_sibling_index()))
+            if not overlaps(phase, start, end):
+                continue
+            yield {
+                "project": project.id,
+                "id": phase.id,
+                "parent": phase.parent_id,
+                "index": ".".join(labels),
+                "title": phase.title,
+                "type": phase.get_phase_type_display(),
+                "start": phase.computed_start,
+                "end": phase.computed_end,
+                "duration": phase.duration,
+                "delay": phase.delay,
+            }
+
+
+def iter_csv(rows):
+    writer = csv.DictWriter(Echo(), fieldnames=EXPORT_FIELDS)
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_jsonl(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + "\n"
+
+
+class PhaseExportView(PermissionRequiredMixin, View):
+    """Streams phases of all projects as CSV or JSON Lines, optionally
+    filtered by project and by a window of dates"""
+
+    permission_required = "timeline.view_phase"
+    formats = {
+        "csv": (iter_csv, "text/csv"),
+        "jsonl": (iter_jsonl, "application/jsonl"),
+    }
+
+    def get(self, request, *args, **kwargs):
+        form = PhaseExportForm(request.GET)
+        if not form.is_valid():
+            return HttpResponseBadRequest(form.errors.as_text())
+        data = form.cleaned_data
+        projects = data["project"] or Phase.objects.filter(parent_id=None)
+        start, end = data["start"], data["end"]
+        if start or end:
+            projects = projects.in_window(start or date.min, end or date.max)
+        projects = projects.order_by("position", "id")
+        export_format = data["format"] or "csv"
+        stream, content_type = self.formats[export_format]
+        response = StreamingHttpResponse(
+            stream(iter_export_rows(projects, start, end)),
+            content_type=content_type,
+        )
+        response[
+            "Content-Disposition"
+        ] = 'attachment; filename="timeline.%(format)s"' % {"format": export_format}
+        return response
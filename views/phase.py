@@ -1,8 +1,25 @@
+from urllib.parse import urlparse
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import PermissionRequiredMixin
-from django.http import Http404
+from django.db import transaction
+from django.http import Http404, HttpResponseBadRequest
 from django.shortcuts import get_object_or_404
-from django.urls import reverse
+from django.template.loader import render_to_string
+from django.template.response import TemplateResponse
+from django.urls import Resolver404, resolve, reverse
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.crypto import md5
+from django.utils.functional import SimpleLazyObject
+from django.utils.http import quote_etag
+from django.utils.timezone import now
+from django.utils.translation import get_language
 from django.utils.translation import gettext_lazy as _
 from django.views.generic import (
     CreateView,
@@ -10,13 +27,27 @@ from django.views.generic import (
     ListView,
     TemplateView,
     UpdateView,
+    View,
 )
-from timeline.forms import PhaseCreateForm
+from timeline.cache import get_cache_timeout, get_project_version, get_projects_version
+from timeline.charts import get_chart_mode, get_chart_zoom, get_svg_chart
+from timeline.forms import PhaseCreateForm, PhaseParentSearchForm, PhaseReorderForm
 from timeline.models import (
+    ZOOM_CHOICES,
+    ZOOMS,
     Phase,
-    get_month_dict,
+    delete_subtree,
+    get_chart_columns,
+    get_chart_pages,
+    get_chart_title,
+    get_path_ids,
     get_position_by_parent,
+    get_project_phases,
+    get_soft_delete,
+    get_tree_index,
+    lock_siblings,
     move_younger_siblings,
+    restore_subtree,
 )
 
 
@@ -38,6 +69,110 @@ class HxOnlyTemplateMixin:
         return [self.template_name]
 
 
+async def aget_object_or_404(klass, *args, **kwargs):
+    """Like get_object_or_404, with the async ORM"""
+    try:
+        return await klass.objects.aget(*args, **kwargs)
+    except klass.DoesNotExist:
+        raise Http404(
+            "No %(name)s matches the given query." % {"name": klass._meta.object_name}
+        )
+
+
+class AsyncViewMixin:
+    """Async handlers for ASGI. Sync setups of views may query the database,
+    handlers do instead. Permissions are checked off the event loop, since
+    the user is loaded lazily"""
+
+    def setup(self, request, *args, **kwargs):
+        View.setup(self, request, *args, **kwargs)
+
+    async def dispatch(self, request, *args, **kwargs):
+        if not await sync_to_async(self.has_permission)():
+            return await sync_to_async(self.handle_no_permission)()
+        return await super(PermissionRequiredMixin, self).dispatch(
+            request, *args, **kwargs
+        )
+
+
+class ChartWindowMixin:
+    """Reads the chart window from year, month and the chosen zoom"""
+
+    def setup(self, request, *args, **kwargs):
+        super().setup(request, *args, **kwargs)
+        self.setup_chart()
+
+    def setup_chart(self):
+        """Zoom and mode are kept in session"""
+        self.year, self.month = self.kwargs["year"], self.kwargs["month"]
+        self.zoom = get_chart_zoom(self.request)
+        self.chart_mode = get_chart_mode(self.request)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        previous, next = get_chart_pages(self.year, self.month, self.zoom)
+        context.update(
+            {
+                "year": self.year,
+                "month": self.month,
+                "zoom": self.zoom,
+                "zoom_choices": ZOOM_CHOICES,
+                "chart_mode": self.chart_mode,
+                "chart_title": get_chart_title(self.year, self.month, self.zoom),
+                "chart_columns": get_chart_columns(self.year, self.month, self.zoom),
+                "previous": previous,
+                "next": next,
+            }
+        )
+        return context
+
+
+class ConditionalListMixin:
+    """Answers conditional requests with 304 Not Modified if the list would
+    render the same. The ETag hashes the cache version of the listed data,
+    that changes with every save and delete, with the url, that holds the
+    window and cursors, the chart settings kept in session and today, that
+    columns mark. Lists with pending messages always render, to show them"""
+
+    def get_list_version(self):
+        """Version of the listed data, None if the cache keeps none. All
+        projects by default, one version bumped by changes to any of them"""
+        return get_projects_version()
+
+    def get_etag(self):
+        if len(messages.get_messages(self.request)):
+            return None
+        version = self.get_list_version()
+        if version is None:
+            return None
+        key = [
+            version,
+            self.request.get_full_path(),
+            bool(self.request.htmx),
+            self.zoom,
+            self.chart_mode,
+            get_language(),
+            now().date(),
+        ]
+        return quote_etag(md5(repr(key).encode(), usedforsecurity=False).hexdigest())
+
+    def set_validators(self, response, etag):
+        """Lists are stored by browsers, and revalidated before use"""
+        if etag and response.status_code in (200, 304):
+            response.headers.setdefault("ETag", etag)
+            patch_cache_control(response, private=True, no_cache=True)
+        # pages and fragments share urls
+        patch_vary_headers(response, ["HX-Request"])
+        return response
+
+    def get(self, request, *args, **kwargs):
+        etag = self.get_etag()
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        return self.set_validators(response, etag)
+
+
 class RefreshListMixin:
     """Triggers the refresh list event that holds state"""
 
@@ -47,7 +182,157 @@ class RefreshListMixin:
         return response
 
 
-class PhaseListView(PermissionRequiredMixin, HxPageTemplateMixin, ListView):
+def get_list_rows(project):
+    """Ids and parent ids of the rows of the phase list, in tree order, and
+    computed dates of the rows by id"""
+    rows = project.descendants(include_self=True)
+    if get_tree_index():
+        # phases are sorted in tree order once fetched
+        rows = rows.only(
+            "parent_id", "position", "path", "depth", "computed_start", "computed_end"
+        )
+        rows = [
+            (row.pk, row.parent_id, row.computed_start, row.computed_end)
+            for row in rows
+        ]
+    else:
+        rows = rows.values_list("id", "parent_id", "computed_start", "computed_end")
+    dates = {id: (start, end) for id, parent_id, start, end in rows}
+    return [(id, parent_id) for id, parent_id, start, end in rows], dates
+
+
+def get_row_labels(rows):
+    """Maps ids of rows to their path of sibling indexes, and whether they
+    are the last of their siblings, as shown by detail.html"""
+    paths = {}
+    last = {}
+    counts = {}
+    for id, parent_id in rows:
+        index = counts.get(parent_id, 0)
+        counts[parent_id] = index + 1
+        paths[id] = paths.get(parent_id, ()) + (index,)
+        last[parent_id] = id
+    return {id: (paths[id], last[parent_id] == id) for id, parent_id in rows}
+
+
+def get_subtree(rows, id):
+    """Ids of the phase with id and its descendants among rows"""
+    subtree = {id}
+    for row_id, parent_id in rows:
+        if parent_id in subtree:
+            subtree.add(row_id)
+    return subtree
+
+
+def get_swap_ranges(old, new, changed=()):
+    """Compares rows before and after a change, returns ids of old rows to
+    delete, of new rows to insert in their place, and of the row that
+    follows them, if any. Rows with changed labels, or in changed, are
+    always replaced."""
+    old_ids = [id for id, parent_id in old]
+    new_ids = [id for id, parent_id in new]
+    old_labels = get_row_labels(old)
+    new_labels = get_row_labels(new)
+    dirty = set(changed)
+    dirty.update(id for id in new_labels if old_labels.get(id) != new_labels[id])
+    length = min(len(old_ids), len(new_ids))
+    start = 0
+    while start < length and old_ids[start] == new_ids[start]:
+        if old_ids[start] in dirty:
+            break
+        start += 1
+    end = 0
+    while end < length - start and old_ids[-1 - end] == new_ids[-1 - end]:
+        if old_ids[-1 - end] in dirty:
+            break
+        end += 1
+    following = old_ids[-end] if end else None
+    return (
+        old_ids[start : len(old_ids) - end],
+        new_ids[start : len(new_ids) - end],
+        following,
+    )
+
+
+class SwapRowsMixin:
+    """Swaps changed rows of the phase list out of band, if the request comes
+    from the list of the project of the phase. Else triggers the refresh list
+    event"""
+
+    swap_template_name = "timeline/htmx/swap_rows.html"
+
+    def snapshot_rows(self, phase):
+        """Remembers the rows of the phase list, call before changing phase"""
+        self.swap_project = None
+        if phase is None:
+            # a new project, outside the list
+            return
+        if not self.request.htmx or not self.request.htmx.current_url:
+            return
+        try:
+            match = resolve(urlparse(self.request.htmx.current_url).path)
+        except Resolver404:
+            return
+        if match.view_name != "timeline:list":
+            return
+        zoom = get_chart_zoom(self.request)
+        if get_chart_mode(self.request) != "table" or ZOOMS[zoom]["fold_days"]:
+            # the list has no rows to swap, or rows fold into others
+            return
+        project_id = phase.get_project_id()
+        if str(project_id) != match.kwargs["pk"]:
+            return
+        self.swap_project = Phase.objects.get(id=project_id)
+        self.swap_kwargs = match.kwargs
+        self.swap_zoom = zoom
+        self.swap_rows, self.swap_dates = get_list_rows(self.swap_project)
+
+    def swap_rows_response(self, changed=None):
+        """Renders the out of band swap of changed rows, None if the rows of
+        the list were not remembered"""
+        if not getattr(self, "swap_project", None):
+            return None
+        rows, dates = get_list_rows(self.swap_project)
+        changed = get_subtree(rows, changed.id) if changed is not None else set()
+        # dependencies reschedule phases out of the subtree too
+        changed.update(
+            id for id, span in dates.items() if self.swap_dates.get(id, span) != span
+        )
+        deleted, inserted, following = get_swap_ranges(self.swap_rows, rows, changed)
+        year, month = self.swap_kwargs["year"], self.swap_kwargs["month"]
+        object_list = Phase.objects.filter(id__in=inserted)
+        object_list = object_list.with_schedule().with_tree_labels()
+        context = {
+            "project": self.swap_project,
+            "year": year,
+            "month": month,
+            "zoom": self.swap_zoom,
+            "deleted": deleted,
+            "object_list": object_list.with_bar_geometry(
+                year, month, zoom=self.swap_zoom
+            ),
+            "following": following,
+        }
+        response = TemplateResponse(self.request, self.swap_template_name, context)
+        response["HX-Reswap"] = "none"
+        return response
+
+    def render_to_response(self, context, **response_kwargs):
+        response = self.swap_rows_response()
+        if response:
+            return response
+        response = super().render_to_response(context, **response_kwargs)
+        response["HX-Trigger-After-Swap"] = "refreshList"
+        return response
+
+
+class PhaseListView(
+    PermissionRequiredMixin,
+    HxPageTemplateMixin,
+    ConditionalListMixin,
+    ChartWindowMixin,
+    ListView,
+):
     """Rendered in #content"""
 
     permission_required = "timeline.view_phase"
@@ -58,21 +343,51 @@ class PhaseListView(PermissionRequiredMixin, HxPageTemplateMixin, ListView):
         super().setup(request, *args, **kwargs)
         self.project = get_object_or_404(Phase, id=kwargs["pk"])
 
+    def get_list_version(self):
+        return get_project_version(self.project.id)
+
     def get_queryset(self):
         qs = self.project.descendants(include_self=True)
-        qs = qs.with_tree_fields()
+        qs = qs.with_schedule().with_tree_labels().with_folding(self.zoom)
+        qs = qs.with_bar_geometry(self.year, self.month, zoom=self.zoom)
         return qs
 
+    def get_chart(self):
+        # built only if not cached
+        return SimpleLazyObject(
+            lambda: get_svg_chart(
+                self.object_list, self.year, self.month, zoom=self.zoom
+            )
+        )
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data()
         context["project"] = self.project
-        context["year"] = self.kwargs["year"]
-        context["month"] = self.kwargs["month"]
-        context["month_dict"] = get_month_dict(context["year"], context["month"])
+        context["cache_timeout"] = get_cache_timeout()
+        context["cache_version"] = get_project_version(self.project.get_project_id())
+        if self.chart_mode == "svg":
+            context["chart"] = self.get_chart()
         return context
 
 
-class PhaseCreateView(PermissionRequiredMixin, HxOnlyTemplateMixin, CreateView):
+class PhaseSvgView(PhaseListView):
+    """Gantt of the phases of a project as one SVG image"""
+
+    template_name = "timeline/svg/phases.svg"
+    content_type = "image/svg+xml"
+
+    def get_template_names(self):
+        return [self.template_name]
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data()
+        context["chart"] = self.get_chart()
+        return context
+
+
+class PhaseCreateView(
+    PermissionRequiredMixin, HxOnlyTemplateMixin, SwapRowsMixin, CreateView
+):
     """Rendered in #add_button, swaps none"""
 
     permission_required = "timeline.add_phase"
@@ -89,16 +404,25 @@ class PhaseCreateView(PermissionRequiredMixin, HxOnlyTemplateMixin, CreateView):
         initial["parent"] = self.project
         return initial
 
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs["project"] = Phase(pk=self.project.get_project_id())
+        return kwargs
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data()
         context["project"] = self.project
         return context
 
     def form_valid(self, form):
-        form.instance.position = get_position_by_parent(form.instance.parent)
         report = _("Added phase '%(title)s'") % {"title": form.instance.title}
         messages.success(self.request, report)
-        return super(PhaseCreateView, self).form_valid(form)
+        self.snapshot_rows(form.instance.parent)
+        with transaction.atomic():
+            lock_siblings(form.instance.parent)
+            form.instance.position = get_position_by_parent(form.instance.parent)
+            response = super(PhaseCreateView, self).form_valid(form)
+        return self.swap_rows_response() or response
 
     def get_success_url(self):
         return reverse("timeline:refresh_list")
@@ -121,6 +445,53 @@ class PhaseAddButtonView(HxOnlyTemplateMixin, TemplateView):
         return context
 
 
+def resolve_project_title(phases):
+    """Attaches the title of their project to phases"""
+    project_ids = {
+        phase.pk: (get_path_ids(phase.path) or [phase.pk])[0] for phase in phases
+    }
+    titles = Phase.objects.filter(pk__in=set(project_ids.values()))
+    titles = dict(titles.values_list("pk", "title"))
+    for phase in phases:
+        phase.project_title = titles.get(project_ids[phase.pk])
+
+
+def get_search_limit():
+    return getattr(settings, "TIMELINE_SEARCH_LIMIT", 20)
+
+
+class PhaseParentSearchView(PermissionRequiredMixin, HxOnlyTemplateMixin, ListView):
+    """Rendered in the parent select of phase forms. Options are the phases
+    of project if the search is empty, else phases of any project whose
+    title matches"""
+
+    permission_required = "timeline.view_phase"
+    model = Phase
+    template_name = "timeline/htmx/parent_options.html"
+
+    def get(self, request, *args, **kwargs):
+        self.form = PhaseParentSearchForm(request.GET)
+        if not self.form.is_valid():
+            return HttpResponseBadRequest()
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        search = self.form.cleaned_data["search"]
+        if not search:
+            project = get_object_or_404(Phase, id=self.form.cleaned_data["project"])
+            return get_project_phases(project)
+        qs = Phase.objects.filter(title__icontains=search).order_by("title", "id")
+        return qs.with_resolver(resolve_project_title)[: get_search_limit()]
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data()
+        field = PhaseCreateForm.base_fields["parent"]
+        context["choices"] = [
+            (phase.pk, field.label_from_instance(phase)) for phase in self.object_list
+        ]
+        return context
+
+
 class PhaseDetailView(PermissionRequiredMixin, HxOnlyTemplateMixin, DetailView):
     """Rendered in #phase-index-{{ self.id }}"""
 
@@ -129,6 +500,9 @@ class PhaseDetailView(PermissionRequiredMixin, HxOnlyTemplateMixin, DetailView):
     context_object_name = "phase"
     template_name = "timeline/htmx/detail.html"
 
+    def get_queryset(self):
+        return Phase.objects.with_tree_labels()
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data()
         if "project" in self.request.GET:
@@ -138,7 +512,9 @@ class PhaseDetailView(PermissionRequiredMixin, HxOnlyTemplateMixin, DetailView):
         return context
 
 
-class PhaseUpdateView(PermissionRequiredMixin, HxOnlyTemplateMixin, UpdateView):
+class PhaseUpdateView(
+    PermissionRequiredMixin, HxOnlyTemplateMixin, SwapRowsMixin, UpdateView
+):
     """Rendered in and redirects to #phase-index-{{ self.id }}"""
 
     permission_required = "timeline.change_phase"
@@ -155,56 +531,236 @@ class PhaseUpdateView(PermissionRequiredMixin, HxOnlyTemplateMixin, UpdateView):
         self.original_parent = obj.parent
         return obj
 
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        # roots have an empty path, their id is enough
+        kwargs["project"] = Phase(pk=self.object.get_project_id())
+        return kwargs
+
     def form_valid(self, form):
-        if not self.original_parent == form.instance.parent:
-            move_younger_siblings(self.original_parent, form.instance.position)
+        if self.original_parent or not form.instance.parent:
+            # projects turned into phases leave their list
+            self.snapshot_rows(self.object)
+        if self.original_parent == form.instance.parent:
+            response = super().form_valid(form)
+            return self.swap_rows_response(changed=self.object) or response
+        with transaction.atomic():
+            lock_siblings(form.instance.parent)
+            position = form.instance.position
             form.instance.position = get_position_by_parent(form.instance.parent)
-        return super().form_valid(form)
+            response = super().form_valid(form)
+            move_younger_siblings(self.original_parent, position)
+        return self.swap_rows_response(changed=self.object) or response
 
     def get_success_url(self, *args, **kwargs):
         return reverse("timeline:refresh_list")
 
 
+class ConfirmChangeMixin:
+    """Changes the object on POST, GET renders only the confirmation"""
+
+    confirm_template_name = None
+
+    def get_object(self):
+        return get_object_or_404(Phase, id=self.kwargs["pk"])
+
+    def get_template_names(self):
+        names = super().get_template_names()
+        if self.request.method == "GET":
+            return [self.confirm_template_name]
+        return names
+
+    def get(self, request, *args, **kwargs):
+        # neither swaps rows nor refreshes the list
+        self.object = self.get_object()
+        context = self.get_context_data(object=self.object, **kwargs)
+        return TemplateResponse(request, self.get_template_names(), context)
+
+    def post(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        self.change()
+        return super().get(request, *args, **kwargs)
+
+
 class PhaseDeleteView(
-    PermissionRequiredMixin, HxOnlyTemplateMixin, RefreshListMixin, TemplateView
+    PermissionRequiredMixin,
+    ConfirmChangeMixin,
+    HxOnlyTemplateMixin,
+    SwapRowsMixin,
+    TemplateView,
 ):
-    """Rendered in #phase-index-{{ self.id }}, triggers refresh list"""
+    """Swaps changed rows, else rendered in #phase-index-{{ self.id }} and
+    triggers refresh list"""
 
     permission_required = "timeline.delete_phase"
     template_name = "timeline/htmx/delete.html"
+    confirm_template_name = "timeline/htmx/delete_confirm.html"
+    message_template_name = "timeline/htmx/deleted_message.html"
+
+    def change(self):
+        phase = self.object
+        if phase.parent_id:
+            self.snapshot_rows(phase)
+        soft = get_soft_delete()
+        delete_subtree(phase, soft)
+        if soft:
+            # with a button to undo
+            report = render_to_string(
+                self.message_template_name, {"phase": phase}, request=self.request
+            )
+        else:
+            report = _("Deleted phase '%(title)s'") % {"title": phase.title}
+        messages.error(self.request, report)
 
-    def setup(self, request, *args, **kwargs):
-        super().setup(request, *args, **kwargs)
-        phase = get_object_or_404(Phase, id=self.kwargs["pk"])
-        report = _("Deleted phase '%(title)s'") % {"title": phase.title}
-        messages.error(request, report)
-        move_younger_siblings(phase.parent, phase.position)
-        phase.delete()
+
+class PhaseRestoreView(
+    PermissionRequiredMixin,
+    ConfirmChangeMixin,
+    HxOnlyTemplateMixin,
+    SwapRowsMixin,
+    TemplateView,
+):
+    """Restores a soft deleted phase. Swaps changed rows, else rendered in
+    place of the message and triggers refresh list"""
+
+    permission_required = "timeline.delete_phase"
+    template_name = "timeline/htmx/restore.html"
+    confirm_template_name = "timeline/htmx/restore_confirm.html"
+
+    def get_object(self):
+        # deleted along with their parent, they come back with it
+        deleted = Phase.all_objects.filter(
+            deleted_at__isnull=False, parent__deleted_at=None
+        )
+        return get_object_or_404(deleted, id=self.kwargs["pk"])
+
+    def change(self):
+        phase = self.object
+        if phase.parent_id:
+            self.snapshot_rows(phase.parent)
+        restore_subtree(phase)
+        report = _("Restored phase '%(title)s'") % {"title": phase.title}
+        messages.success(self.request, report)
 
 
 class PhaseMoveDownView(
-    PermissionRequiredMixin, HxOnlyTemplateMixin, RefreshListMixin, TemplateView
+    PermissionRequiredMixin, HxOnlyTemplateMixin, SwapRowsMixin, TemplateView
 ):
-    """Rendered in #phase-index-{{ self.id }}, triggers refresh list"""
+    """Swaps changed rows, else rendered in #phase-index-{{ self.id }} and
+    triggers refresh list"""
 
     permission_required = "timeline.change_phase"
     template_name = "timeline/htmx/move.html"
+    # moves only on POST, prefetched or replayed links change nothing
+    http_method_names = ["post"]
 
-    def setup(self, request, *args, **kwargs):
-        super().setup(request, *args, **kwargs)
+    def post(self, request, *args, **kwargs):
         self.object = get_object_or_404(Phase, id=self.kwargs["pk"])
+        self.change()
+        return self.get(request, *args, **kwargs)
+
+    def change(self):
+        self.snapshot_rows(self.object)
         self.object.move_down()
 
 
 class PhaseMoveUpView(
-    PermissionRequiredMixin, HxOnlyTemplateMixin, RefreshListMixin, TemplateView
+    PermissionRequiredMixin, HxOnlyTemplateMixin, SwapRowsMixin, TemplateView
 ):
-    """Rendered in #phase-index-{{ self.id }}, triggers refresh list"""
+    """Swaps changed rows, else rendered in #phase-index-{{ self.id }} and
+    triggers refresh list"""
 
     permission_required = "timeline.change_phase"
     template_name = "timeline/htmx/move.html"
+    # moves only on POST, prefetched or replayed links change nothing
+    http_method_names = ["post"]
 
-    def setup(self, request, *args, **kwargs):
-        super().setup(request, *args, **kwargs)
+    def post(self, request, *args, **kwargs):
         self.object = get_object_or_404(Phase, id=self.kwargs["pk"])
+        self.change()
+        return self.get(request, *args, **kwargs)
+
+    def change(self):
+        self.snapshot_rows(self.object)
         self.object.move_up()
+
+
+class PhaseReorderView(
+    PermissionRequiredMixin, HxOnlyTemplateMixin, SwapRowsMixin, TemplateView
+):
+    """Moves phase to posted index among siblings, for drag and drop.
+    Swaps changed rows, else rendered in #phase-index-{{ self.id }} and
+    triggers refresh list"""
+
+    permission_required = "timeline.change_phase"
+    template_name = "timeline/htmx/move.html"
+
+    def post(self, request, *args, **kwargs):
+        self.object = get_object_or_404(Phase, id=self.kwargs["pk"])
+        form = PhaseReorderForm(request.POST)
+        if not form.is_valid():
+            return HttpResponseBadRequest()
+        self.snapshot_rows(self.object)
+        self.object.move_to(form.cleaned_data["index"])
+        return self.get(request, *args, **kwargs)
+
+
+class AsyncPhaseListView(AsyncViewMixin, PhaseListView):
+    """PhaseListView for ASGI"""
+
+    async def get(self, request, *args, **kwargs):
+        self.project = await aget_object_or_404(Phase, id=kwargs["pk"])
+        await sync_to_async(self.setup_chart)()
+        etag = await sync_to_async(self.get_etag)()
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            # fetched at once, resolvers need every phase
+            self.object_list = [phase async for phase in self.get_queryset()]
+            context = await sync_to_async(self.get_context_data)()
+            response = self.render_to_response(context)
+        return self.set_validators(response, etag)
+
+
+class AsyncPhaseCreateView(AsyncViewMixin, PhaseCreateView):
+    """PhaseCreateView for ASGI, forms are validated and saved off the event
+    loop"""
+
+    async def get(self, request, *args, **kwargs):
+        self.project = await aget_object_or_404(Phase, id=kwargs["pk"])
+        return await sync_to_async(super().get)(request, *args, **kwargs)
+
+    async def post(self, request, *args, **kwargs):
+        self.project = await aget_object_or_404(Phase, id=kwargs["pk"])
+        return await sync_to_async(super().post)(request, *args, **kwargs)
+
+    async def put(self, *args, **kwargs):
+        return await self.post(*args, **kwargs)
+
+
+class AsyncChangeMixin(AsyncViewMixin):
+    """Async handler of views that change a phase. Changes lock siblings in
+    transactions, and run off the event loop with swapped rows"""
+
+    async def post(self, request, *args, **kwargs):
+        return await self.achange(**kwargs)
+
+    async def achange(self, **kwargs):
+        self.object = await aget_object_or_404(Phase, id=kwargs["pk"])
+        await sync_to_async(self.change)()
+        context = self.get_context_data(**kwargs)
+        return await sync_to_async(self.render_to_response)(context)
+
+
+class AsyncPhaseDeleteView(AsyncChangeMixin, PhaseDeleteView):
+    """PhaseDeleteView for ASGI, deletes on POST"""
+
+    async def get(self, request, *args, **kwargs):
+        return await sync_to_async(PhaseDeleteView.get)(self, request, *args, **kwargs)
+
+
+class AsyncPhaseMoveDownView(AsyncChangeMixin, PhaseMoveDownView):
+    """PhaseMoveDownView for ASGI"""
+
+
+class AsyncPhaseMoveUpView(AsyncChangeMixin, PhaseMoveUpView):
+    """PhaseMoveUpView for ASGI"""
@@ -1,12 +1,74 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import PermissionRequiredMixin
+from django.db import transaction
+from django.db.models import Q
 from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.functional import SimpleLazyObject
 from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _
 from django.views.generic import FormView, ListView, RedirectView, TemplateView
-from timeline.forms import ProjectCreateForm
-from timeline.models import Phase, get_month_dict, get_position_by_parent
-from timeline.views.phase import HxOnlyTemplateMixin, HxPageTemplateMixin
+from timeline.cache import (
+    get_cache_timeout,
+    get_portfolio_version,
+    get_project_versions,
+)
+from timeline.charts import get_svg_chart
+from timeline.forms import PhaseImportForm, ProjectCreateForm
+from timeline.imports import import_tree
+from timeline.models import (
+    Phase,
+    get_chart_start_end,
+    get_position_by_parent,
+    lock_siblings,
+)
+from timeline.views.phase import (
+    AsyncViewMixin,
+    ChartWindowMixin,
+    ConditionalListMixin,
+    HxOnlyTemplateMixin,
+    HxPageTemplateMixin,
+)
+
+
+def resolve_cache_version(phases):
+    """Attaches fragment cache versions to projects"""
+    versions = get_project_versions([phase.id for phase in phases])
+    for phase in phases:
+        phase.cache_version = versions[phase.id]
+
+
+def get_chart_versions(versions):
+    """Cache key part of a chart of projects, from (id, version) pairs"""
+    return ",".join("%(id)s.%(version)s" % {"id": i, "version": v} for i, v in versions)
+
+
+def get_window_filter():
+    return getattr(settings, "TIMELINE_WINDOW_FILTER", False)
+
+
+def get_page_size():
+    return getattr(settings, "TIMELINE_PAGE_SIZE", 25)
+
+
+def get_cursor(value):
+    """Parses a 'position_id' cursor, returns None if invalid"""
+    try:
+        position, id = value.split("_")
+        return int(position), int(id)
+    except (AttributeError, ValueError):
+        return None
+
+
+def get_project_cursor(phase):
+    return "%(position)s_%(id)s" % {"position": phase.position, "id": phase.id}
+
+
+def after_cursor(cursor):
+    position, id = cursor
+    return Q(position__gt=position) | Q(position=position, id__gt=id)
 
 
 class BaseRedirectView(RedirectView):
@@ -18,22 +80,143 @@ class BaseRedirectView(RedirectView):
         )
 
 
-class ProjectListView(PermissionRequiredMixin, HxPageTemplateMixin, ListView):
-    """Rendered in #content"""
+class ProjectListView(
+    PermissionRequiredMixin,
+    HxPageTemplateMixin,
+    ConditionalListMixin,
+    ChartWindowMixin,
+    ListView,
+):
+    """Rendered in #content, or in place of the load more row if paginating
+    after a cursor. Refreshing with until cursors reloads loaded pages"""
 
     permission_required = "timeline.view_phase"
     model = Phase
     template_name = "timeline/project/htmx/list.html"
 
-    def get_queryset(self):
-        qs = Phase.objects.filter(parent_id=None)
+    def get_template_names(self):
+        if self.request.htmx and self.after:
+            return ["timeline/project/htmx/rows.html"]
+        return super().get_template_names()
+
+    def get_roots(self):
+        """Projects in the chart window, reads the cursors"""
+        self.after = get_cursor(self.request.GET.get("after"))
+        until = [get_cursor(value) for value in self.request.GET.getlist("until")]
+        self.until = max(filter(None, until), default=None)
+        self.hidden_count = 0
+        self.window = None
+        qs = Phase.objects.filter(parent_id=None).order_by("position", "id")
+        if get_window_filter():
+            self.window = get_chart_start_end(self.year, self.month, self.zoom)
         return qs
 
+    def get_page(self, qs, size):
+        """Projects of a page of size, with one more to tell if there are
+        more pages"""
+        qs = qs.with_project_span().with_sibling_flags()
+        qs = qs.with_bar_geometry(self.year, self.month, True, self.zoom)
+        qs = qs.with_resolver(resolve_cache_version)
+        return qs[: size + 1]
+
+    def set_page(self, phases, size):
+        self.has_more = len(phases) > size
+        return phases[:size]
+
+    def get_querysets(self):
+        """Projects after the cursor, the pair of all and shown projects
+        to count those hidden by the window, if any, and the loaded pages
+        if refreshing"""
+        qs = self.get_roots()
+        counted = None
+        if self.window:
+            if not self.after:
+                counted = (qs, qs.in_window(*self.window))
+            qs = qs.in_window(*self.window)
+        if self.after:
+            qs = qs.filter(after_cursor(self.after))
+        loaded = qs.exclude(after_cursor(self.until)) if self.until else None
+        return qs, counted, loaded
+
+    def get_queryset(self):
+        qs, counted, loaded = self.get_querysets()
+        if counted:
+            self.hidden_count = counted[0].count() - counted[1].count()
+        size = get_page_size()
+        if loaded is not None:
+            # loaded pages, a full one if they are all gone
+            size = loaded.count() or size
+        return self.set_page(list(self.get_page(qs, size)), size)
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data()
-        context["year"] = self.kwargs["year"]
-        context["month"] = self.kwargs["month"]
-        context["month_dict"] = get_month_dict(context["year"], context["month"])
+        context["cache_timeout"] = get_cache_timeout()
+        context["portfolio_version"] = get_portfolio_version()
+        if self.object_list:
+            context["cursor"] = get_project_cursor(self.object_list[-1])
+        context["has_more"] = self.has_more
+        context["hidden_count"] = self.hidden_count
+        if self.chart_mode == "svg":
+            context["chart_versions"] = get_chart_versions(
+                (phase.id, phase.cache_version) for phase in self.object_list
+            )
+            context["chart"] = SimpleLazyObject(
+                lambda: get_svg_chart(
+                    self.object_list, self.year, self.month, True, self.zoom
+                )
+            )
+        return context
+
+
+class AsyncProjectListView(AsyncViewMixin, ProjectListView):
+    """ProjectListView for ASGI"""
+
+    async def get(self, request, *args, **kwargs):
+        await sync_to_async(self.setup_chart)()
+        etag = await sync_to_async(self.get_etag)()
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            await self.aset_object_list()
+            context = await sync_to_async(self.get_context_data)()
+            response = self.render_to_response(context)
+        return self.set_validators(response, etag)
+
+    async def aset_object_list(self):
+        qs, counted, loaded = self.get_querysets()
+        if counted:
+            self.hidden_count = await counted[0].acount() - await counted[1].acount()
+        size = get_page_size()
+        if loaded is not None:
+            size = await loaded.acount() or size
+        # fetched at once, resolvers need every project
+        phases = [phase async for phase in self.get_page(qs, size)]
+        self.object_list = self.set_page(phases, size)
+
+
+class ProjectSvgView(
+    PermissionRequiredMixin, ConditionalListMixin, ChartWindowMixin, TemplateView
+):
+    """Gantt of all projects as one SVG image"""
+
+    permission_required = "timeline.view_phase"
+    template_name = "timeline/svg/projects.svg"
+    content_type = "image/svg+xml"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        year, month, zoom = self.year, self.month, self.zoom
+        qs = Phase.objects.filter(parent_id=None).order_by("position", "id")
+        if get_window_filter():
+            qs = qs.in_window(*get_chart_start_end(year, month, zoom))
+        versions = get_project_versions(list(qs.values_list("id", flat=True)))
+        context["chart_versions"] = get_chart_versions(versions.items())
+        qs = qs.with_project_span().with_bar_geometry(year, month, True, zoom)
+        # built only if not cached
+        context["chart"] = SimpleLazyObject(
+            lambda: get_svg_chart(qs, year, month, True, zoom)
+        )
+        context["cache_timeout"] = get_cache_timeout()
+        context["portfolio_version"] = get_portfolio_version()
         return context
 
 
@@ -49,12 +232,31 @@ class ProjectCreateView(HxOnlyTemplateMixin, FormView):
         project = Phase()
         project.title = form.cleaned_data["title"]
         project.start = form.cleaned_data["start"]
-        project.position = get_position_by_parent(None)
-        project.save()
+        with transaction.atomic():
+            lock_siblings(None)
+            project.position = get_position_by_parent(None)
+            project.save()
+            if form.cleaned_data["suite"]:
+                project.create_suite(form.cleaned_data["suite"].nodes)
         report = _("Added project '%(title)s'") % {"title": project.title}
         messages.success(self.request, report)
-        if form.cleaned_data["suite"]:
-            project.create_suite()
+        return super().form_valid(form)
+
+    def get_success_url(self):
+        return reverse("timeline:refresh_list")
+
+
+class ProjectImportView(PermissionRequiredMixin, HxOnlyTemplateMixin, FormView):
+    """Rendered in #add_button, swaps errors in place"""
+
+    permission_required = "timeline.add_phase"
+    form_class = PhaseImportForm
+    template_name = "timeline/project/htmx/import.html"
+
+    def form_valid(self, form):
+        created = import_tree(form.cleaned_data["nodes"])
+        report = _("Imported %(count)s phases") % {"count": len(created)}
+        messages.success(self.request, report)
         return super().form_valid(form)
 
     def get_success_url(self):